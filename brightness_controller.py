@@ -1,24 +1,112 @@
 import screen_brightness_control as sbc
+import numpy as np
 import logging
 import ctypes
 from ctypes import wintypes
+import math
+import json
 import time
 import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait
 
 logger = logging.getLogger(__name__)
 
+class PHYSICAL_MONITOR(ctypes.Structure):
+    """dxva2 physical monitor handle and description"""
+    _fields_ = [
+        ("hPhysicalMonitor", wintypes.HANDLE),
+        ("szPhysicalMonitorDescription", wintypes.WCHAR * 128),
+    ]
+
+def _load_monitor_api():
+    """Load user32/dxva2 once and declare the monitor configuration prototypes"""
+    try:
+        user32 = ctypes.WinDLL('user32')
+        dxva2 = ctypes.WinDLL('dxva2')
+    except (AttributeError, OSError):
+        # Not on Windows (or dxva2 missing) - only the sbc fallback is usable
+        return None, None, None
+    
+    monitor_enum_proc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HMONITOR, wintypes.HDC,
+                                           ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+    user32.EnumDisplayMonitors.argtypes = [wintypes.HDC, ctypes.POINTER(wintypes.RECT), monitor_enum_proc, wintypes.LPARAM]
+    user32.EnumDisplayMonitors.restype = wintypes.BOOL
+    
+    dxva2.GetNumberOfPhysicalMonitorsFromHMONITOR.argtypes = [wintypes.HMONITOR, ctypes.POINTER(wintypes.DWORD)]
+    dxva2.GetNumberOfPhysicalMonitorsFromHMONITOR.restype = wintypes.BOOL
+    dxva2.GetPhysicalMonitorsFromHMONITOR.argtypes = [wintypes.HMONITOR, wintypes.DWORD, ctypes.POINTER(PHYSICAL_MONITOR)]
+    dxva2.GetPhysicalMonitorsFromHMONITOR.restype = wintypes.BOOL
+    dxva2.DestroyPhysicalMonitor.argtypes = [wintypes.HANDLE]
+    dxva2.DestroyPhysicalMonitor.restype = wintypes.BOOL
+    dxva2.SetMonitorBrightness.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+    dxva2.SetMonitorBrightness.restype = wintypes.BOOL
+    dxva2.GetMonitorBrightness.argtypes = [wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD),
+                                           ctypes.POINTER(wintypes.DWORD), ctypes.POINTER(wintypes.DWORD)]
+    dxva2.GetMonitorBrightness.restype = wintypes.BOOL
+    return user32, dxva2, monitor_enum_proc
+
+_user32, _dxva2, MONITORENUMPROC = _load_monitor_api()
+
+# Named pipe served by posturifyd.py so several processes can share one set of monitor handles
+DAEMON_ADDRESS = r'\\.\pipe\posturifyd'
+
+# Requests closer than this to the current level are ignored to absorb detector jitter
+BRIGHTNESS_HYSTERESIS = 2
+
+# SWbemServices.ExecQuery flags: forward-only, semisynchronous enumeration
+WBEM_FLAG_RETURN_IMMEDIATELY = 0x10
+WBEM_FLAG_FORWARD_ONLY = 0x20
+_WBEM_QUERY_FLAGS = WBEM_FLAG_RETURN_IMMEDIATELY | WBEM_FLAG_FORWARD_ONLY
+
+# Posted to the fade mailbox by close() to end the fade worker
+_FADE_STOP = object()
+
+def compute_fade_steps(start, target, steps, curve='linear'):
+    """Integer brightness level reached after each fade step ('linear' or 'log' curve)"""
+    # One vectorised pass instead of per-step Python arithmetic; levels 0-100 fit in int8
+    if curve == 'log':
+        # Perceived brightness is ~logarithmic: spend steps in the low end, de-duplicate the rest
+        levels = np.unique(np.rint(np.geomspace(max(start, 1), max(target, 1), steps + 1)[1:]).astype(np.int8))
+        return levels if target >= start else levels[::-1]
+    return np.rint(np.linspace(start, target, steps + 1)[1:]).astype(np.int8)
+
 class BrightnessController:
     def __init__(self):
         self.current_brightness = None
         self.monitors = []
+        self._sbc_displays = []  # sbc display names, only used when DDC/CI handles are unavailable
+        self._phys_names = []  # Descriptions of the monitors behind _phys_handles
+        self._phys_handles = []  # DDC/CI-capable handles opened once in discover_monitors
+        self._wmi_local = threading.local()  # Per-thread (SWbemServices, WmiMonitorBrightnessMethods)
+        self._wmi_unavailable = False  # Set once WMI brightness control is known not to work
         self.brightness_lock = threading.Lock()  # Add lock for thread safety
+        self._closed = False
         self.discover_monitors()
         self.get_current_brightness()
+        
+        # One worker per monitor: each sits on its own I2C bus, so writes can overlap
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self._phys_handles)))
+        
+        # Single-slot fade mailbox: only the most recent fade target is ever applied
+        self._fade_q = queue.Queue(maxsize=1)
+        self._fade_thread = threading.Thread(target=self._fade_worker, daemon=True)
+        self._fade_thread.start()
     
     def discover_monitors(self):
         """Discover all available monitors on Windows"""
+        self._sbc_displays = []
+        self._open_physical_monitors()
+        if self._phys_handles:
+            # Names come from the PHYSICAL_MONITOR structs, no WMI query needed
+            self.monitors = list(self._phys_names)
+            logger.info(f"Discovered {len(self.monitors)} monitor(s): {self.monitors}")
+            return
+        
+        # No handle answered DDC/CI (e.g. laptop panels, whose handles fail DDC calls) - let sbc enumerate for its own fallback path
         try:
-            self.monitors = sbc.list_monitors()
+            self._sbc_displays = sbc.list_monitors()
+            self.monitors = list(self._sbc_displays)
             if self.monitors:
                 logger.info(f"Discovered {len(self.monitors)} monitor(s): {self.monitors}")
             else:
@@ -27,101 +115,333 @@ class BrightnessController:
             logger.error(f"Failed to discover monitors: {e}")
             self.monitors = []
     
+    def _open_physical_monitors(self):
+        """Open DDC/CI handles for every physical monitor once so writes skip re-enumeration"""
+        self._close_physical_monitors()
+        if _dxva2 is None:
+            return
+        try:
+            hmonitors = []
+            def _collect(hmonitor, hdc, rect, lparam):
+                hmonitors.append(hmonitor)
+                return True
+            _user32.EnumDisplayMonitors(None, None, MONITORENUMPROC(_collect), 0)
+            
+            for hmonitor in hmonitors:
+                count = wintypes.DWORD()
+                if not _dxva2.GetNumberOfPhysicalMonitorsFromHMONITOR(hmonitor, ctypes.byref(count)) or not count.value:
+                    continue
+                physical = (PHYSICAL_MONITOR * count.value)()
+                if not _dxva2.GetPhysicalMonitorsFromHMONITOR(hmonitor, count.value, physical):
+                    continue
+                for monitor in physical:
+                    # Internal panels return a handle too, but DDC/CI calls on it fail; probe once and keep only working ones
+                    min_, cur, max_ = wintypes.DWORD(), wintypes.DWORD(), wintypes.DWORD()
+                    if _dxva2.GetMonitorBrightness(monitor.hPhysicalMonitor, ctypes.byref(min_),
+                                                   ctypes.byref(cur), ctypes.byref(max_)):
+                        self._phys_handles.append(monitor.hPhysicalMonitor)
+                        self._phys_names.append(monitor.szPhysicalMonitorDescription)
+                    else:
+                        logger.debug("Monitor %r does not support DDC/CI brightness", monitor.szPhysicalMonitorDescription)
+                        _dxva2.DestroyPhysicalMonitor(monitor.hPhysicalMonitor)
+            
+            logger.info(f"Opened {len(self._phys_handles)} DDC/CI monitor handle(s)")
+        except Exception as e:
+            logger.warning(f"Failed to open physical monitor handles: {e}")
+    
+    def _close_physical_monitors(self):
+        """Release handles obtained from GetPhysicalMonitorsFromHMONITOR"""
+        if self._phys_handles:
+            try:
+                for handle in self._phys_handles:
+                    _dxva2.DestroyPhysicalMonitor(handle)
+            except Exception as e:
+                logger.warning(f"Failed to release physical monitor handles: {e}")
+        self._phys_names = []
+        self._phys_handles = []
+    
+    def close(self):
+        """Stop the fade worker, shut the write pool down and destroy the monitor handles"""
+        if self._closed:
+            return
+        self._closed = True
+        
+        # The worker wakes on the mailbox even mid-fade; only an in-progress write can delay it
+        self._post_fade(_FADE_STOP)
+        self._fade_thread.join(timeout=2.0)
+        
+        # Tear down under the lock so no read or write is using a handle as it is destroyed;
+        # later calls see _closed and return without touching the hardware
+        with self.brightness_lock:
+            self._pool.shutdown(wait=True)
+            self._close_physical_monitors()
+    
     def get_current_brightness(self):
         """Get current screen brightness"""
+        with self.brightness_lock:
+            if self._closed:
+                return self.current_brightness if self.current_brightness is not None else 100
+            return self._read_brightness()
+    
+    def _read_brightness(self):
+        """get_current_brightness body; called with brightness_lock held"""
         try:
-            if self.monitors:
-                # Get brightness from first monitor
-                brightness_values = sbc.get_brightness()
-                if isinstance(brightness_values, list) and len(brightness_values) > 0:
-                    self.current_brightness = brightness_values[0]
+            brightness = None
+            if self._phys_handles:
+                # Read straight from the first cached DDC/CI handle
+                min_, cur, max_ = wintypes.DWORD(), wintypes.DWORD(), wintypes.DWORD()
+                if _dxva2.GetMonitorBrightness(self._phys_handles[0], ctypes.byref(min_),
+                                               ctypes.byref(cur), ctypes.byref(max_)):
+                    brightness = cur.value
                 else:
-                    self.current_brightness = brightness_values
-            else:
-                # Fallback method
-                self.current_brightness = sbc.get_brightness()
+                    logger.debug("GetMonitorBrightness failed, falling back to WMI")
             
-            logger.info(f"Current brightness: {self.current_brightness}%")
+            if brightness is None:
+                # Internal panels (or a failed DDC read): a single WMI query
+                brightness = self._get_brightness_wmi()
+            if brightness is None:
+                # Last resort: sbc returns one value per display, use the first
+                brightness = (sbc.get_brightness() or [100])[0]
+            self.current_brightness = brightness
+            
+            logger.debug("Current brightness: %s%%", self.current_brightness)
             return self.current_brightness
         except Exception as e:
             logger.error(f"Failed to get current brightness: {e}")
             return 100  # Default to full brightness
     
-    def set_brightness(self, brightness_level):
-        """Set screen brightness (0-100) on Windows"""
-        with self.brightness_lock:  # Prevent concurrent brightness changes
-            try:
-                if brightness_level < 0:
-                    brightness_level = 0
-                elif brightness_level > 100:
-                    brightness_level = 100
-                
-                logger.info(f"Setting brightness to {brightness_level}%")
-                
-                # Try setting brightness for all monitors
-                if self.monitors:
-                    for monitor in self.monitors:
+    def set_brightness(self, brightness_level, exact=False, blocking=True):
+        """Set screen brightness (0-100) on Windows; exact=True bypasses the hysteresis band"""
+        # Prevent concurrent brightness changes; fade steps skip rather than queue behind a write
+        if not self.brightness_lock.acquire(blocking=blocking):
+            logger.debug("Dropping stale brightness request (%s%%)", brightness_level)
+            return False
+        try:
+            if self._closed:
+                logger.debug("Ignoring brightness request (%s%%) after close", brightness_level)
+                return False
+            
+            if brightness_level < 0:
+                brightness_level = 0
+            elif brightness_level > 100:
+                brightness_level = 100
+            
+            # Already there (or close enough) - skip the DDC/CI round trip
+            if self.current_brightness is not None:
+                difference = abs(brightness_level - self.current_brightness)
+                if difference == 0 or (not exact and difference < BRIGHTNESS_HYSTERESIS):
+                    return True
+            
+            logger.debug("Setting brightness to %s%%", brightness_level)
+            
+            # Native DDC/CI write first; sbc is only the last-resort fallback
+            if not self._set_brightness_dxva2(brightness_level) and not self._set_brightness_wmi(brightness_level):
+                if self._sbc_displays:
+                    for monitor in self._sbc_displays:
                         try:
                             sbc.set_brightness(brightness_level, display=monitor)
-                            logger.info(f"Set brightness to {brightness_level}% on monitor: {monitor}")
+                            logger.debug("Set brightness to %s%% on monitor: %s", brightness_level, monitor)
                         except Exception as monitor_error:
-                            logger.warning(f"Failed to set brightness on monitor {monitor}: {monitor_error}")
+                            logger.warning("Failed to set brightness on monitor %s: %s", monitor, monitor_error)
                 else:
                     # Fallback to general method
                     sbc.set_brightness(brightness_level)
-                    logger.info(f"Set brightness to {brightness_level}% (general method)")
-                
-                self.current_brightness = brightness_level
-                
-                # Add small delay to ensure change takes effect
-                time.sleep(0.1)
-                return True
-                
+                    logger.debug("Set brightness to %s%% (general method)", brightness_level)
+            
+            self.current_brightness = brightness_level
+            return True
+            
+        except Exception as e:
+            logger.error("Failed to set brightness to %s%%: %s", brightness_level, e)
+            return False
+        finally:
+            self.brightness_lock.release()
+    
+    def _set_brightness_dxva2(self, brightness_level):
+        """Write brightness to every cached physical monitor handle via dxva2"""
+        if not self._phys_handles:
+            return False
+        
+        # Fan the blocking DDC/CI writes out across monitors; ctypes releases the GIL
+        futures = [self._pool.submit(_dxva2.SetMonitorBrightness, handle, brightness_level)
+                   for handle in self._phys_handles]
+        wait(futures)
+        
+        success = True
+        for handle, future in zip(self._phys_handles, futures):
+            if future.result():
+                logger.debug("Set brightness to %s%% on monitor handle: %s", brightness_level, handle)
+            else:
+                logger.warning("Failed to set brightness on monitor handle %s", handle)
+                success = False
+        return success
+    
+    def _get_wbem(self):
+        """Return this thread's root/wmi connection as (SWbemServices, WmiMonitorBrightnessMethods), or None"""
+        if self._wmi_unavailable:
+            return None
+        conn = getattr(self._wmi_local, 'conn', None)
+        if conn is None:
+            try:
+                import pythoncom
+                import win32com.client
+                # COM objects belong to the apartment that created them, so every thread
+                # (caller, fade worker, pool) initialises COM and connects on its own
+                pythoncom.CoInitialize()
+                locator = win32com.client.Dispatch('WbemScripting.SWbemLocator')
+                wbem = locator.ConnectServer('.', 'root\\wmi')
+                methods = None
+                for item in wbem.ExecQuery("SELECT * FROM WmiMonitorBrightnessMethods", "WQL",
+                                           _WBEM_QUERY_FLAGS):
+                    methods = item
+                    break
+                if methods is None:
+                    # Desktop monitors don't expose WmiMonitorBrightnessMethods
+                    raise LookupError("no WmiMonitorBrightnessMethods instance")
+                conn = self._wmi_local.conn = (wbem, methods)
+            except ImportError:
+                logger.warning("pywin32 not available for WMI brightness fallback")
+                self._wmi_unavailable = True
             except Exception as e:
-                logger.error(f"Failed to set brightness to {brightness_level}%: {e}")
-                # Try Windows WMI fallback
-                return self._set_brightness_wmi(brightness_level)
+                logger.info(f"WMI brightness control unavailable: {e}")
+                self._wmi_unavailable = True
+        return conn
+    
+    def _get_brightness_wmi(self):
+        """Read CurrentBrightness only, with a forward-only WMI query"""
+        conn = self._get_wbem()
+        if not conn:
+            return None
+        
+        wbem, _ = conn
+        for item in wbem.ExecQuery("SELECT CurrentBrightness FROM WmiMonitorBrightness", "WQL",
+                                   _WBEM_QUERY_FLAGS):
+            return int(item.CurrentBrightness)
+        return None
     
     def _set_brightness_wmi(self, brightness_level):
-        """Fallback method using Windows WMI"""
+        """Fallback for internal panels without DDC/CI using this thread's cached WMI connection"""
+        conn = self._get_wbem()
+        if not conn:
+            return False
+        
         try:
-            import wmi
-            c = wmi.WMI(namespace='wmi')
-            methods = c.WmiMonitorBrightnessMethods()[0]
-            methods.WmiSetBrightness(brightness_level, 0)
-            logger.info(f"Set brightness to {brightness_level}% using WMI")
+            _, methods = conn
+            params = methods.Methods_("WmiSetBrightness").InParameters.SpawnInstance_()
+            params.Properties_.Item("Timeout").Value = 0
+            params.Properties_.Item("Brightness").Value = brightness_level
+            methods.ExecMethod_("WmiSetBrightness", params)
+            logger.debug("Set brightness to %s%% using WMI", brightness_level)
             return True
-        except ImportError:
-            logger.warning("WMI module not available for brightness fallback")
-            return False
         except Exception as e:
-            logger.error(f"WMI brightness fallback failed: {e}")
+            logger.error("WMI brightness fallback failed: %s", e)
             return False
     
-    def fade_brightness(self, target_brightness, duration=2.0, steps=20):
-        """Gradually fade brightness to target level"""
+    def fade_brightness(self, target_brightness, duration=2.0, steps=20, curve='linear', strict_interval=True):
+        """Gradually fade brightness to target level along a 'linear' or 'log' curve"""
         try:
-            start_brightness = self.get_current_brightness()
+            # current_brightness is read once at startup and kept in sync by set_brightness
+            start_brightness = self.current_brightness
             if start_brightness is None:
                 start_brightness = 100
             
-            step_size = (target_brightness - start_brightness) / steps
-            step_duration = duration / steps
+            steps = self._fade_steps(steps, target_brightness - start_brightness)
+            levels = compute_fade_steps(start_brightness, target_brightness, steps, curve).tolist()
+            step_duration = duration / len(levels)
             
-            for i in range(steps):
-                current_step_brightness = start_brightness + (step_size * (i + 1))
-                self.set_brightness(int(current_step_brightness))
-                time.sleep(step_duration)
+            start_time = time.monotonic()
+            last_level = start_brightness
+            for i, level in enumerate(levels):
+                if level != last_level:  # Skip writes that wouldn't change the level
+                    self.set_brightness(level, blocking=False)
+                    last_level = level
+                if strict_interval:
+                    # Pace steps against absolute deadlines so write latency doesn't stretch the fade
+                    deadline = start_time + (i + 1) * step_duration
+                    time.sleep(max(0.0, deadline - time.monotonic()))
+                else:
+                    time.sleep(step_duration)
             
             # Ensure we end at exactly the target brightness
-            self.set_brightness(target_brightness)
-            logger.info(f"Faded brightness from {start_brightness}% to {target_brightness}%")
+            self.set_brightness(target_brightness, exact=True)
+            logger.info("Faded brightness from %s%% to %s%%", start_brightness, target_brightness)
             return True
             
         except Exception as e:
             logger.error(f"Failed to fade brightness: {e}")
             # Fallback to direct setting
-            return self.set_brightness(target_brightness)
+            return self.set_brightness(target_brightness, exact=True)
+    
+    def _fade_steps(self, steps, delta):
+        """Limit the number of fade writes for a brightness change of delta"""
+        # Never schedule more steps than there are distinct integer levels
+        steps = min(steps, int(abs(delta)))
+        if self._phys_handles and abs(delta) > 1:
+            # Each DDC/CI write is a slow I2C round trip, so fall back to ~log2(delta) coarse steps
+            steps = min(steps, math.ceil(math.log2(abs(delta))))
+        return max(1, steps)
+    
+    def request_fade(self, target_brightness, duration=2.0):
+        """Fade to target in the background; a newer request replaces a pending or running one"""
+        self._post_fade((target_brightness, duration))
+    
+    def _post_fade(self, request):
+        """Put a request in the single-slot fade mailbox, replacing any pending one"""
+        while True:
+            try:
+                self._fade_q.put_nowait(request)
+                return
+            except queue.Full:
+                # Drop the stale request so only the latest target applies
+                try:
+                    self._fade_q.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def _fade_worker(self):
+        """Consume fade requests, switching to a newer one as soon as it arrives"""
+        request = None
+        while True:
+            if request is None:
+                request = self._fade_q.get()
+            if request is _FADE_STOP:
+                return
+            try:
+                request = self._run_fade(*request)
+            except Exception as e:
+                logger.error(f"Background fade failed: {e}")
+                request = None
+    
+    def _run_fade(self, target_brightness, duration, steps=20):
+        """Ease towards target; returns a newer request if one preempts this fade"""
+        start_brightness = self.current_brightness
+        if start_brightness is None:
+            start_brightness = 100
+        
+        delta = target_brightness - start_brightness
+        steps = self._fade_steps(steps, delta)
+        step_duration = duration / steps
+        start_time = time.monotonic()
+        last_level = start_brightness
+        for i in range(steps):
+            t = (i + 1) / steps
+            eased = t * t * (3 - 2 * t)  # Cubic ease-in-out
+            level = int(round(start_brightness + delta * eased))
+            # Intermediate steps are dropped if a caller is writing; the final one must land
+            final_step = i == steps - 1
+            if level != last_level or final_step:
+                self.set_brightness(level, exact=final_step, blocking=final_step)
+                last_level = level
+            
+            # Wait out the rest of this step, but wake immediately on a new request
+            remaining = max(0.0, start_time + (i + 1) * step_duration - time.monotonic())
+            try:
+                return self._fade_q.get(timeout=remaining)
+            except queue.Empty:
+                pass
+        
+        logger.info("Faded brightness from %s%% to %s%%", start_brightness, target_brightness)
+        return None
     
     def restore_brightness(self):
         """Restore brightness to 100%"""
@@ -134,3 +454,71 @@ class BrightnessController:
     def brighten_screen(self):
         """Quickly brighten screen for good posture"""
         return self.set_brightness(100)
+
+class RemoteBrightnessController:
+    """Thin proxy that forwards brightness calls to a running posturifyd daemon"""
+    def __init__(self, address=DAEMON_ADDRESS):
+        from multiprocessing.connection import Client
+        self._conn = Client(address)
+        self._conn_lock = threading.Lock()  # Keep request/reply pairs together across threads
+    
+    def _call(self, op, *args, default=None):
+        """Send one operation to the daemon and return its result"""
+        try:
+            with self._conn_lock:
+                self._conn.send_bytes(json.dumps({"op": op, "args": args}).encode())
+                reply = json.loads(self._conn.recv_bytes())
+        except (OSError, EOFError) as e:
+            logger.error("Brightness daemon connection failed during %s: %s", op, e)
+            return default
+        
+        if 'error' in reply:
+            logger.error("Brightness daemon failed %s: %s", op, reply['error'])
+            return default
+        return reply['result']
+    
+    def close(self):
+        """Disconnect from the daemon; its controller and monitor handles stay open there"""
+        try:
+            self._conn.close()
+        except OSError:
+            pass
+    
+    def get_current_brightness(self):
+        """Get current screen brightness"""
+        return self._call('get_current_brightness', default=100)
+    
+    def set_brightness(self, brightness_level, exact=False, blocking=True):
+        """Set screen brightness (0-100) through the daemon"""
+        return self._call('set_brightness', brightness_level, exact, blocking, default=False)
+    
+    def fade_brightness(self, target_brightness, duration=2.0, steps=20, curve='linear', strict_interval=True):
+        """Gradually fade brightness to target level"""
+        return self._call('fade_brightness', target_brightness, duration, steps, curve, strict_interval,
+                          default=False)
+    
+    def request_fade(self, target_brightness, duration=2.0):
+        """Fade to target in the daemon's background fade worker"""
+        return self._call('request_fade', target_brightness, duration)
+    
+    def restore_brightness(self):
+        """Restore brightness to 100%"""
+        return self._call('restore_brightness', default=False)
+    
+    def dim_screen(self):
+        """Quickly dim screen for slouching"""
+        return self._call('dim_screen', default=False)
+    
+    def brighten_screen(self):
+        """Quickly brighten screen for good posture"""
+        return self._call('brighten_screen', default=False)
+
+def connect_brightness_controller():
+    """Use the posturifyd daemon if it is running, otherwise open the monitors in-process"""
+    try:
+        controller = RemoteBrightnessController()
+        logger.info("Connected to brightness daemon at %s", DAEMON_ADDRESS)
+        return controller
+    except (OSError, ValueError):
+        # No daemon listening (or named pipes unsupported on this platform)
+        return BrightnessController()
@@ -7,54 +7,61 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+def _get(name, cast, default):
+    """Read a setting from the environment and convert it to its type"""
+    return cast(os.getenv(name, str(default)))
+
 # Roboflow Configuration
 ROBOFLOW_API_KEY = os.getenv('ROBOFLOW_API_KEY', 'your_roboflow_api_key_here')
 ROBOFLOW_PROJECT = os.getenv('ROBOFLOW_PROJECT', 'your_project_name')
-ROBOFLOW_VERSION = int(os.getenv('ROBOFLOW_VERSION', '1'))
+ROBOFLOW_VERSION = _get('ROBOFLOW_VERSION', int, 1)
 
 # Spotify Configuration
 SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID', 'your_spotify_client_id')
 SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET', 'your_spotify_client_secret')
 SPOTIFY_REDIRECT_URI = os.getenv('SPOTIFY_REDIRECT_URI', 'http://localhost:8888/callback')
 
+# Optional local model (ONNX export of the Roboflow project); empty path = hosted API only
+LOCAL_MODEL_PATH = os.getenv('LOCAL_MODEL_PATH', '')
+LOCAL_MODEL_CLASSES = os.getenv('LOCAL_MODEL_CLASSES', '')  # Comma-separated, in model output order
+
 # Detection Settings
-CONFIDENCE_THRESHOLD = float(os.getenv('CONFIDENCE_THRESHOLD', '0.5'))
-DETECTION_INTERVAL = float(os.getenv('DETECTION_INTERVAL', '0.2'))  # Even faster - 5 times per second
-DISPLAY_INTERVAL = float(os.getenv('DISPLAY_INTERVAL', '0.03'))  # Display updates ~33 FPS
+CONFIDENCE_THRESHOLD = _get('CONFIDENCE_THRESHOLD', float, 0.5)
+DETECTION_INTERVAL = _get('DETECTION_INTERVAL', float, 0.2)  # Even faster - 5 times per second
+DISPLAY_INTERVAL = _get('DISPLAY_INTERVAL', float, 0.03)  # Display updates ~33 FPS
 
 # Brightness Settings
-NORMAL_BRIGHTNESS = int(os.getenv('NORMAL_BRIGHTNESS', '100'))
-SLOUCHING_BRIGHTNESS = int(os.getenv('SLOUCHING_BRIGHTNESS', '20'))
+NORMAL_BRIGHTNESS = _get('NORMAL_BRIGHTNESS', int, 100)
+SLOUCHING_BRIGHTNESS = _get('SLOUCHING_BRIGHTNESS', int, 20)
+ABSENT_BRIGHTNESS = _get('ABSENT_BRIGHTNESS', int, 30)
 
 # Sleep Mode Settings
 USER_ABSENT_TIMEOUT = 3  # Timeout in seconds for user absence before system sleeps
 
+# Required settings and the placeholder values they ship with
+_SENTINELS = (
+    ('ROBOFLOW_API_KEY', ROBOFLOW_API_KEY, 'your_roboflow_api_key_here'),
+    ('ROBOFLOW_PROJECT', ROBOFLOW_PROJECT, 'your_project_name'),
+    ('SPOTIFY_CLIENT_ID', SPOTIFY_CLIENT_ID, 'your_spotify_client_id'),
+    ('SPOTIFY_CLIENT_SECRET', SPOTIFY_CLIENT_SECRET, 'your_spotify_client_secret'),
+)
+
+# Settings never change after import, so check them once
+_MISSING = tuple(name for name, value, sentinel in _SENTINELS if value == sentinel)
+
 def validate_config():
     """Validate that all required configuration is present"""
-    missing_vars = []
-    
-    if ROBOFLOW_API_KEY == 'your_roboflow_api_key_here':
-        missing_vars.append('ROBOFLOW_API_KEY')
-    
-    if ROBOFLOW_PROJECT == 'your_project_name':
-        missing_vars.append('ROBOFLOW_PROJECT')
-        
-    if SPOTIFY_CLIENT_ID == 'your_spotify_client_id':
-        missing_vars.append('SPOTIFY_CLIENT_ID')
-        
-    if SPOTIFY_CLIENT_SECRET == 'your_spotify_client_secret':
-        missing_vars.append('SPOTIFY_CLIENT_SECRET')
-    
-    return missing_vars
+    return list(_MISSING)
 
 def print_config_status():
     """Print current configuration status"""
     print("Configuration Status:")
-    print(f"   Roboflow API Key: {'Set' if ROBOFLOW_API_KEY != 'your_roboflow_api_key_here' else 'Not set'}")
+    print(f"   Roboflow API Key: {'Not set' if 'ROBOFLOW_API_KEY' in _MISSING else 'Set'}")
     print(f"   Roboflow Project: {ROBOFLOW_PROJECT}")
-    print(f"   Spotify Client ID: {'Set' if SPOTIFY_CLIENT_ID != 'your_spotify_client_id' else 'Not set'}")
+    print(f"   Spotify Client ID: {'Not set' if 'SPOTIFY_CLIENT_ID' in _MISSING else 'Set'}")
     print(f"   Confidence Threshold: {CONFIDENCE_THRESHOLD}")
     print(f"   Detection Interval: {DETECTION_INTERVAL}s")
     print(f"   Normal Brightness: {NORMAL_BRIGHTNESS}%")
     print(f"   Slouching Brightness: {SLOUCHING_BRIGHTNESS}%")
+    print(f"   Absent Brightness: {ABSENT_BRIGHTNESS}%")
     print(f"   User Absent Timeout: {USER_ABSENT_TIMEOUT}s")
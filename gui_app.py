@@ -10,39 +10,69 @@ import tempfile
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 from PIL import Image, ImageTk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import sv_ttk
 import cv2
+import numpy as np
 import config
 import threading
+import queue
+import collections
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from slouching_detector import SlouchingDetector, PostureState
+from slouching_detector import SlouchingDetector, CaptureWorker, PostureState, STATE_TEXT, draw_status_overlay
+from brightness_controller import connect_brightness_controller
+from spotify_controller import SpotifyController
+
+# Widest frame passed to detection and display (initialize_camera asks for 640x480)
+MAX_FRAME_WIDTH = 640
+
+# Size of the in-window camera preview
+PREVIEW_SIZE = (320, 240)
+
+# Compact int8 codes for recording posture history
+POSTURE_CODES = {state: code for code, state in enumerate(PostureState)}
 
 class LogHandler(logging.Handler):
     """Custom logging handler to display logs in GUI"""
     def __init__(self, text_widget):
         super().__init__()
         self.text_widget = text_widget
+        self._pending = collections.deque()
+        self._flush_scheduled = False
     
     def emit(self, record):
         log_entry = self.format(record)
         timestamp = datetime.now().strftime("%H:%M:%S")
+        self._pending.append(f"[{timestamp}] {log_entry}")
         
-        # Schedule the GUI update in the main thread
-        self.text_widget.after(0, self._append_log, f"[{timestamp}] {log_entry}")
+        # Schedule one GUI update in the main thread for everything queued in the next 50ms
+        # (handle() already holds self.lock here)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.text_widget.after(50, self._flush)
     
-    def _append_log(self, message):
-        self.text_widget.insert(tk.END, message + "\n")
-        self.text_widget.see(tk.END)
+    def _flush(self):
+        # Clear the flag first so a record emitted during the drain schedules its own flush
+        with self.lock:
+            self._flush_scheduled = False
+        batch = []
+        while self._pending:
+            batch.append(self._pending.popleft())
+        if batch:
+            self.text_widget.insert(tk.END, "\n".join(batch) + "\n")
+            self.text_widget.see(tk.END)
 
 class SlouchingDetectorGUI:
     def __init__(self, root):
         self.root = root
+        self._debug = False  # Set True to trace the monitoring lifecycle on stdout
         self.root.title("Slouching Detector")
         self.root.geometry("700x650") # Adjusted size for better fit
         self.root.resizable(False, False)
@@ -61,48 +91,88 @@ class SlouchingDetectorGUI:
         
         self.root.configure(bg=self.colors["background"])
 
-        # Style Configuration
-        s = ttk.Style()
+        # Style Configuration, overriding some theme styles for a custom look
+        styles = {
+            "TFrame": {"background": self.colors["background"]},
+            "TLabel": {"background": self.colors["background"], "foreground": self.colors["foreground"]},
+            "TLabelFrame": {"background": self.colors["background"], "bordercolor": self.colors["accent_blue"]},
+            "TLabelFrame.Label": {"background": self.colors["background"], "foreground": self.colors["accent_blue"]},
+        }
+        style_maps = {}
         try:
             sv_ttk.set_theme("dark")
-            # Override some sv_ttk styles for a custom look
-            s.configure("TFrame", background=self.colors["background"])
-            s.configure("TLabel", background=self.colors["background"], foreground=self.colors["foreground"])
-            s.configure("TLabelFrame", background=self.colors["background"], bordercolor=self.colors["accent_blue"])
-            s.configure("TLabelFrame.Label", background=self.colors["background"], foreground=self.colors["accent_blue"])
         except Exception:
-            s.theme_use('clam')
-            s.configure("TFrame", background=self.colors["background"])
-            s.configure("TLabel", background=self.colors["background"], foreground=self.colors["foreground"])
-            s.configure("TLabelFrame", background=self.colors["background"], bordercolor=self.colors["accent_blue"])
-            s.configure("TLabelFrame.Label", background=self.colors["background"], foreground=self.colors["accent_blue"])
-            s.configure("TButton", background=self.colors["panel"], foreground=self.colors["foreground"], borderwidth=1)
-            s.map("TButton", background=[('active', self.colors["accent_blue"])])
+            ttk.Style().theme_use('clam')
+            styles["TButton"] = {"background": self.colors["panel"], "foreground": self.colors["foreground"], "borderwidth": 1}
+            style_maps["TButton"] = {"background": [('active', self.colors["accent_blue"])]}
         # Custom button styles
-        s.configure("Accent.TButton", font=("Segoe UI", 10, "bold"), foreground=self.colors["background"], background=self.colors["accent_green"])
-        s.map("Accent.TButton", background=[('active', '#B9D7A8')]) # Lighter green on hover
+        styles["Accent.TButton"] = {"font": "{Segoe UI} 10 bold", "foreground": self.colors["background"], "background": self.colors["accent_green"]}
+        style_maps["Accent.TButton"] = {"background": [('active', '#B9D7A8')]} # Lighter green on hover
 
-        s.configure("Stop.TButton", font=("Segoe UI", 10, "bold"), foreground=self.colors["background"], background=self.colors["accent_red"])
-        s.map("Stop.TButton", background=[('active', '#D1868E')]) # Lighter red on hover
+        styles["Stop.TButton"] = {"font": "{Segoe UI} 10 bold", "foreground": self.colors["background"], "background": self.colors["accent_red"]}
+        style_maps["Stop.TButton"] = {"background": [('active', '#D1868E')]} # Lighter red on hover
+        self._apply_styles(styles, style_maps)
             
         self.detector = None
         self.detector_thread = None
+        self._bc = None  # Brightness controller for the display, opened on first use
+        
+        # Last (text, foreground) written to each status label, so unchanged refreshes skip Tk
+        self._label_cache = {}
+        
+        # Play/pause clicks collapse into one pending action handled by a single worker
+        self._spotify_lock = threading.Lock()
+        self._spotify_pending = None
+        self._spotify_worker_busy = False
         self.is_running = False
+        self._stopped_event = threading.Event()  # Set by the detector thread as it exits
+        self._stop_requested = False
         
         # Thread-safe variables for frame and status
         self.frame_lock = threading.Lock()
-        self.latest_frame = None
+        self._gray_buf = None  # cvtColor output, sized to the first frame
+        # Preview double buffer: the loop writes _preview_bufs[_write_idx], the GUI reads the other one
+        self._preview_bufs = [np.zeros((PREVIEW_SIZE[1], PREVIEW_SIZE[0]), dtype=np.uint8) for _ in range(2)]
+        self._write_idx = 0
+        self._frame_seq = 0  # Bumped each time a preview is published
+        self._shown_seq = 0
         self.latest_status_text = "Initializing..."
         
         # Initialize the detector_lock
         self.detector_lock = threading.Lock()
         
-        self.posture_history = []
-        self.analysis_canvas = None
+        # Detection runs off the capture loop as at most one in-flight future; results go out to the GUI
+        self._detect_pool = ThreadPoolExecutor(max_workers=1)
+        self._pending_detect = None
+        self._detect_results = queue.Queue()
+        self._latest_state = None
+        
+        # One long-lived thread applies state changes (brightness, music, sleep) in order
+        self._state_queue = queue.Queue(maxsize=4)
+        threading.Thread(target=self._state_worker, daemon=True).start()
+        
+        self.posture_times = []  # time.monotonic() of each detection
+        self.posture_states = []  # POSTURE_CODES of each detection
         
         self.setup_gui()
         self.setup_logging()
     
+    def _apply_styles(self, styles, style_maps):
+        """Apply ttk style options and state maps in a single Tcl eval"""
+        script = []
+        for style, options in styles.items():
+            script.append(f"ttk::style configure {style} " + " ".join(f"-{option} {{{value}}}" for option, value in options.items()))
+        for style, options in style_maps.items():
+            for option, states in options.items():
+                spec = " ".join(f"{state} {value}" for state, value in states)
+                script.append(f"ttk::style map {style} -{option} {{{spec}}}")
+        self.root.tk.eval("\n".join(script))
+
+    def _debug_print(self, message):
+        """Print a lifecycle trace message when debugging is enabled"""
+        if self._debug:
+            print(f"🔧 DEBUG: {message}")
+
     def setup_gui(self):
         """Setup the GUI components with a modern, clean look"""
         # Define fonts for consistency
@@ -122,8 +192,6 @@ class SlouchingDetectorGUI:
 
         self.scrollable_frame.bind("<Configure>", self._on_frame_configure)
         self.main_canvas.bind("<Configure>", self._on_canvas_configure)
-        self.main_canvas.bind('<Enter>', self._bind_to_mousewheel)
-        self.main_canvas.bind('<Leave>', self._unbind_from_mousewheel)
 
         # Main frame with padding, now inside the scrollable_frame
         main_frame = ttk.Frame(self.scrollable_frame, padding="15", style="TFrame")
@@ -168,6 +236,14 @@ class SlouchingDetectorGUI:
         self.stop_button = ttk.Button(control_frame, text="⏹️ Stop Monitoring", command=self.stop_monitoring, state=tk.DISABLED, style="Stop.TButton")
         self.stop_button.pack(fill=tk.X, pady=2)
 
+        # Camera preview, updated in place by _display_frame
+        camera_frame = ttk.LabelFrame(left_panel, text="Camera", padding="10")
+        camera_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+
+        self._tk_photo = ImageTk.PhotoImage(Image.new("L", PREVIEW_SIZE))
+        self.video_label = tk.Label(camera_frame, image=self._tk_photo, bg=self.colors["panel"], bd=0)
+        self.video_label.pack()
+
         # Right Panel: Spotify
         right_panel = ttk.Frame(controls_container, style="TFrame")
         right_panel.grid(row=0, column=1, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -200,7 +276,18 @@ class SlouchingDetectorGUI:
 
         # Analysis Frame (initially hidden)
         self.analysis_frame = ttk.LabelFrame(main_frame, text="Posture Analysis", padding="10")
-        # This frame will be populated with the graph later
+        # One off-screen Agg figure, rasterized into a static image with each session's results
+        self._analysis_fig = Figure(figsize=(4, 3), dpi=100)
+        self._analysis_fig.patch.set_facecolor(self.colors["background"])
+        self._analysis_ax = self._analysis_fig.add_subplot()
+        self._analysis_agg = FigureCanvasAgg(self._analysis_fig)
+        self._build_analysis_pie()
+        self._analysis_photo = ImageTk.PhotoImage("RGBA", self._analysis_agg.get_width_height())
+        self.analysis_label = ttk.Label(self.analysis_frame, image=self._analysis_photo)
+        self.analysis_label.pack(fill=tk.BOTH, expand=True)
+        # Place it once, then hide it; grid_remove() keeps the options for a bare grid() later
+        self.analysis_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
+        self.analysis_frame.grid_remove()
 
         #Log frame below controls
         log_frame = ttk.LabelFrame(main_frame, text="Activity Log", padding="10")
@@ -220,6 +307,9 @@ class SlouchingDetectorGUI:
         log_frame.columnconfigure(0, weight=1)
         log_frame.rowconfigure(0, weight=1)
 
+        # Wheel scrolling is bound on the scroll area's own widgets, not app-wide
+        self._bind_mousewheel(self.main_canvas)
+
     def _on_canvas_configure(self, event=None):
         """Adjust the width of the inner frame to the canvas width"""
         canvas_width = event.width
@@ -231,15 +321,21 @@ class SlouchingDetectorGUI:
 
     def _on_mousewheel(self, event):
         """Scroll the canvas with the mouse wheel"""
-        self.main_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-
-    def _bind_to_mousewheel(self, event=None):
-        """Bind mouse wheel scrolling"""
-        self.main_canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+        if event.num == 4: # X11 wheel up
+            self.main_canvas.yview_scroll(-1, "units")
+        elif event.num == 5: # X11 wheel down
+            self.main_canvas.yview_scroll(1, "units")
+        else:
+            self.main_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
 
-    def _unbind_from_mousewheel(self, event=None):
-        """Unbind mouse wheel scrolling"""
-        self.main_canvas.unbind_all("<MouseWheel>")
+    def _bind_mousewheel(self, widget):
+        """Bind wheel scrolling on a widget and its children, leaving the log to scroll itself"""
+        if widget in (self.log_text, self.log_text.frame):
+            return
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self._on_mousewheel)
+        for child in widget.winfo_children():
+            self._bind_mousewheel(child)
     
     def setup_logging(self):
         """Setup logging to display in GUI"""
@@ -262,7 +358,6 @@ class SlouchingDetectorGUI:
         
         # Check configuration status
         try:
-            import config
             missing = config.validate_config()
             if missing:
                 self.logger.warning(f"Missing configuration: {', '.join(missing)}")
@@ -274,38 +369,38 @@ class SlouchingDetectorGUI:
     
     def start_monitoring(self):
         """Start the slouching detector"""
-        print("🔧 DEBUG: start_monitoring called")
+        self._debug_print("start_monitoring called")
         if self.is_running:
-            print("🔧 DEBUG: Already running, returning")
+            self._debug_print("Already running, returning")
             return
         
         # Clear previous analysis
-        if self.analysis_canvas:
-            self.analysis_canvas.get_tk_widget().destroy()
-            self.analysis_canvas = None
-        self.analysis_frame.grid_forget() # Hide the frame
-        self.posture_history = [] # Reset history
+        self.analysis_frame.grid_remove() # Hide the frame, keeping its widgets and placement
+        self.posture_times = [] # Reset history
+        self.posture_states = []
+        self._latest_state = None
         
         try:
-            print("🔧 DEBUG: Setting status to Starting...")
+            self._debug_print("Setting status to Starting...")
             self.status_label.config(text="🟡 Initializing...", foreground=self.colors["accent_yellow"])
             self.start_button.config(state=tk.DISABLED)
             
-            print("🔧 DEBUG: Creating detector instance...")
+            self._debug_print("Creating detector instance...")
             # Create detector instance with a shutdown callback
             self.detector = SlouchingDetector(shutdown_callback=self._trigger_shutdown)
-            print("🔧 DEBUG: Detector created successfully")
+            self._debug_print("Detector created successfully")
             
-            print("🔧 DEBUG: Starting detector thread...")
+            self._debug_print("Starting detector thread...")
             # Start detector in separate thread (like fast_gui.py)
+            self._stopped_event.clear()
             self.detector_thread = threading.Thread(target=self._run_detector, daemon=True)
             self.detector_thread.start()
-            print("🔧 DEBUG: Thread started successfully")
+            self._debug_print("Thread started successfully")
             
             self.logger.info("Monitoring thread started...")
             
         except Exception as e:
-            print(f"🔧 DEBUG: Exception in start_monitoring: {e}")
+            self._debug_print(f"Exception in start_monitoring: {e}")
             traceback.print_exc()
             self.logger.error(f"Failed to start monitoring: {e}")
             self.status_label.config(text="❌ Failed to start", foreground=self.colors["accent_red"])
@@ -314,19 +409,15 @@ class SlouchingDetectorGUI:
     
     def _run_detector(self):
         """Run the detector (called in separate thread) - following fast_gui.py pattern"""
-        print("🔧 DEBUG: _run_detector thread started")
+        self._debug_print("_run_detector thread started")
+        capture_worker = None
         try:
             # Clear any potential caches first
-            print("🔧 DEBUG: Clearing potential caches...")
-            import gc
+            self._debug_print("Clearing potential caches...")
             gc.collect()
             
             # Try to clear Roboflow cache if it exists
             try:
-                import os
-                import tempfile
-                import shutil
-                
                 # Common cache locations for Roboflow
                 cache_dirs = [
                     os.path.expanduser("~/.roboflow"),
@@ -336,161 +427,252 @@ class SlouchingDetectorGUI:
                 
                 for cache_dir in cache_dirs:
                     if os.path.exists(cache_dir):
-                        print(f"🔧 DEBUG: Found cache directory: {cache_dir}")
+                        self._debug_print(f"Found cache directory: {cache_dir}")
                         try:
                             # Don't actually delete, just list what's there
                             files = os.listdir(cache_dir)
-                            print(f"🔧 DEBUG: Cache contains: {files}")
+                            self._debug_print(f"Cache contains: {files}")
                         except Exception as e:
-                            print(f"🔧 DEBUG: Could not list cache: {e}")
+                            self._debug_print(f"Could not list cache: {e}")
                 
             except Exception as cache_error:
-                print(f"🔧 DEBUG: Cache check failed: {cache_error}")
+                self._debug_print(f"Cache check failed: {cache_error}")
             
-            print("🔧 DEBUG: Cache check completed")
+            self._debug_print("Cache check completed")
             
             # Initialize components in thread (like fast_gui.py)
-            print("🔧 DEBUG: About to initialize Roboflow...")
+            self._debug_print("About to initialize Roboflow...")
             try:
                 # Re-enable Roboflow initialization
                 if not self.detector.initialize_roboflow():
                     self.root.after(0, self._initialization_failed, "Roboflow initialization failed")
                     return
             except Exception as roboflow_error:
-                print(f"🔧 DEBUG: Roboflow initialization crashed: {roboflow_error}")
+                self._debug_print(f"Roboflow initialization crashed: {roboflow_error}")
                 traceback.print_exc()
                 self.root.after(0, self._initialization_failed, f"Roboflow error: {roboflow_error}")
                 return
-            print("🔧 DEBUG: Roboflow initialization successful")
+            self._debug_print("Roboflow initialization successful")
             
-            print("🔧 DEBUG: About to initialize camera...")
+            self._debug_print("About to initialize camera...")
             if not self.detector.initialize_camera():
-                print("🔧 DEBUG: Camera initialization failed")
+                self._debug_print("Camera initialization failed")
                 self.root.after(0, self._initialization_failed, "Camera initialization failed")
                 return
-            print("🔧 DEBUG: Camera initialization successful")
+            self._debug_print("Camera initialization successful")
             
-            print("🔧 DEBUG: About to initialize Spotify...")
+            self._debug_print("About to initialize Spotify...")
             # Initialize Spotify (optional)
             self.detector.spotify_controller.initialize()
-            print("🔧 DEBUG: Spotify initialization complete")
+            self._debug_print("Spotify initialization complete")
             
-            print("🔧 DEBUG: Setting running states...")
+            self._debug_print("Setting running states...")
             # Set running states
             self.is_running = True
             self.detector.running = True
-            self.detector.monitoring_start_time = datetime.now()  # Set monitoring start time
-            print("🔧 DEBUG: Running states set")
+            self.detector.monitoring_start_time = time.monotonic()  # Set monitoring start time
+            self._debug_print("Running states set")
             
-            print("🔧 DEBUG: About to call _initialization_successful...")
+            self._debug_print("About to call _initialization_successful...")
             # Update GUI to show we're running
             self.root.after(0, self._initialization_successful)
-            print("🔧 DEBUG: _initialization_successful scheduled")
+            self._debug_print("_initialization_successful scheduled")
             
             # Schedule the first frame display
             self.root.after(10, self._display_frame)
             
-            # Add a 5-second grace period before starting the main loop
+            # 5-second grace period: the camera and preview run, detection waits
             self.logger.info("Starting in 5 seconds... get ready!")
-            time.sleep(5)
-            self.logger.info("Grace period over. Starting detection.")
-            self.logger.info("Sleep feature: System will sleep after 3 seconds of user absence (10s grace period from start)")
-
-            # Create a window to display the camera feed
-            cv2.namedWindow("Slouching Detector", cv2.WINDOW_NORMAL)
+            grace_end = time.monotonic() + 5.0
 
             # Processing loop with frame-based detection for better performance
             frame_counter = 0
             DETECTION_FRAME_INTERVAL = 3  # Process every 3rd frame
+            DISPLAY_FRAME_INTERVAL = 2  # Refresh the preview every 2nd frame
             self.logger.info(f"Posture detection will run on every {DETECTION_FRAME_INTERVAL}rd frame to optimize performance.")
-            print("🔧 DEBUG: Entering main processing loop...")
+            self._debug_print("Entering main processing loop...")
+            overlay_state = self.detector.current_state
+
+            # Capture runs on its own thread so inference calls don't stall the camera
+            capture_worker = CaptureWorker(self.detector.cap)
+            capture_worker.start()
 
             while self.detector.running and self.is_running:
                 try:
-                    ret, frame = self.detector.cap.read()
-                    if not ret:
-                        self.logger.warning("Failed to grab frame from camera, retrying...")
-                        time.sleep(0.1)
+                    frame_counter += 1
+                    is_detection_frame = frame_counter % DETECTION_FRAME_INTERVAL == 0
+                    is_display_frame = frame_counter % DISPLAY_FRAME_INTERVAL == 0
+                    if not (is_detection_frame or is_display_frame):
+                        # Unused frames are grabbed but never decoded
+                        capture_worker.skip()
                         continue
 
-                    frame_counter += 1
+                    frame = capture_worker.latest()
+                    if frame is None:
+                        self.logger.warning("No new frame from camera, retrying...")
+                        continue
+
+                    # Cameras that ignore the requested resolution are downscaled once, for both detection and display
+                    height, width = frame.shape[:2]
+                    if width > MAX_FRAME_WIDTH:
+                        scaled_size = (MAX_FRAME_WIDTH, round(height * MAX_FRAME_WIDTH / width))
+                        frame = cv2.resize(frame, scaled_size, interpolation=cv2.INTER_AREA)
+
                     processed_frame = frame
-                    status_text = f"State: {self.detector.current_state.value if hasattr(self.detector.current_state, 'value') else self.detector.current_state}"
-
-                    # Detect posture at frame intervals to reduce API calls and improve FPS
-                    if frame_counter % DETECTION_FRAME_INTERVAL == 0:
-                        # Add a lock or check to ensure self.detector is not None
-                        with self.detector_lock:
-                            if self.detector and self.is_running and self.detector.running:
-                                self.logger.info("Running posture detection...")
-                                detected_state = self.detector.detect_posture(frame)
-                                
-                                # ALWAYS process state change, even if it's the same
-                                # This is crucial for the sleep logic to work properly
-                                self.posture_history.append((datetime.now(), detected_state))
-                                threading.Thread(target=self.detector.handle_state_change, args=(detected_state,), daemon=True).start()
-                                
-                                # Update status text based on new detection
-                                status_text = f"State: {detected_state.value if hasattr(detected_state, 'value') else str(detected_state).replace('_', ' ').title()}"
-                            else:
-                                # If detector is gone, break the loop
-                                break
+
+                    if grace_end is not None and time.monotonic() >= grace_end:
+                        grace_end = None
+                        self.logger.info("Grace period over. Starting detection.")
+                        self.logger.info("Sleep feature: System will sleep after 3 seconds of user absence (10s grace period from start)")
+
+                    # Pick up a finished detection, and start the next one only when none is in flight
+                    if self._pending_detect is not None and self._pending_detect.done():
+                        self._collect_detection()
+                    if is_detection_frame and grace_end is None and self._pending_detect is None:
+                        self._pending_detect = self._detect_pool.submit(self._detect_posture, frame.copy())
+
+                    # Show the overlay for the latest detected state
+                    detected_state = self._latest_state
+                    if detected_state is not None:
+                        overlay_state = detected_state
                     
-                    # Convert to grayscale for display
-                    display_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2GRAY)
+                    # Convert to grayscale for display, into a buffer reused across frames
+                    if self._gray_buf is None or self._gray_buf.shape != processed_frame.shape[:2]:
+                        self._gray_buf = np.empty(processed_frame.shape[:2], dtype=np.uint8)
+                    display_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
                     
-                    # Add status text overlay
-                    cv2.putText(display_frame, status_text, (10, 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+                    # Add the cached status text overlay
+                    draw_status_overlay(display_frame, overlay_state)
 
-                    # Display the frame
-                    cv2.imshow("Slouching Detector", display_frame)
-                    cv2.waitKey(1) # Essential for imshow to work
+                    # Downscale straight into the back buffer of the preview
+                    cv2.resize(display_frame, PREVIEW_SIZE, dst=self._preview_bufs[self._write_idx], interpolation=cv2.INTER_AREA)
 
-                    # Safely update the shared frame
+                    # Safely publish the shared frame by flipping buffers
                     with self.frame_lock:
-                        self.latest_frame = display_frame.copy()
+                        self._write_idx ^= 1
+                        self._frame_seq += 1
 
                 except Exception as e:
                     self.logger.error(f"Error in processing loop: {e}")
                     traceback.print_exc()
                     break
             
-            print("🔧 DEBUG: Processing loop ended")
+            self._debug_print("Processing loop ended")
             self.logger.info("Processing loop ended")
                     
         except Exception as e:
-            print(f"🔧 DEBUG: Exception in _run_detector: {e}")
+            self._debug_print(f"Exception in _run_detector: {e}")
             traceback.print_exc()
             self.logger.error(f"Critical error in monitoring thread: {e}")
             self.root.after(0, self._initialization_failed, f"Critical error: {e}")
         finally:
-            print("🔧 DEBUG: _run_detector finally block")
+            self._debug_print("_run_detector finally block")
+            # Let an in-flight detection finish before its detector is torn down
+            if self._pending_detect is not None:
+                done, _ = wait([self._pending_detect], timeout=5.0)
+                if done:
+                    self._collect_detection()
+                else:
+                    self._pending_detect = None
+            # Stop the capture thread before the camera is released underneath it; if it
+            # is stuck in grab() it releases the camera itself once it gets out
+            camera_free = capture_worker.stop() if capture_worker else True
+
             # Clean up resources in the thread that created them
-            if self.detector and hasattr(self.detector, 'cap') and self.detector.cap:
+            if camera_free and self.detector and hasattr(self.detector, 'cap') and self.detector.cap:
                 try:
-                    print("🔧 DEBUG: Releasing camera from detector thread")
+                    self._debug_print("Releasing camera from detector thread")
                     self.detector.cap.release()
                 except Exception as e:
-                    print(f"🔧 DEBUG: Error releasing camera: {e}")
+                    self._debug_print(f"Error releasing camera: {e}")
             
-            try:
-                print("🔧 DEBUG: Destroying OpenCV windows from detector thread")
-                cv2.destroyAllWindows()
-                cv2.waitKey(1)  # Allow time for windows to close
-            except Exception as e:
-                print(f"🔧 DEBUG: Error destroying windows: {e}")
+            # Each Start builds a new detector, so release its monitor handles and fade thread now
+            if self.detector:
+                try:
+                    self.detector.brightness_controller.close()
+                except Exception as e:
+                    self._debug_print(f"Error closing brightness controller: {e}")
             
-            print("🔧 DEBUG: Detector thread cleanup completed")
+            self._debug_print("Detector thread cleanup completed")
+            
+            # Hand the rest of the stop sequence to the main thread
+            self._stopped_event.set()
+            try:
+                self.root.after(0, self._on_stopped_final)
+            except (RuntimeError, tk.TclError):
+                pass # The window is already gone
     
+    def _detect_posture(self, frame):
+        """Run posture detection on the detection pool; returns (timestamp, state) or None"""
+        # Snapshot the detector under the lock; the inference call itself runs outside it so
+        # _cleanup_detector on the Tk thread never waits on a slow HTTP request
+        with self.detector_lock:
+            detector = self.detector
+            if not (detector and self.is_running and detector.running):
+                return None
+        detected_state = detector.detect_posture(frame)
+        return time.monotonic(), detected_state
+
+    def _collect_detection(self):
+        """Post the finished detection's result for the status overlay and the GUI"""
+        future, self._pending_detect = self._pending_detect, None
+        try:
+            result = future.result()
+        except Exception as e:
+            self.logger.error(f"Error in posture detection: {e}")
+            return
+        if result is not None:
+            self._latest_state = result[1]
+            self._detect_results.put(result)
+
+    def _drain_detections(self):
+        """Record detection results and dispatch state changes from the GUI thread"""
+        while True:
+            try:
+                timestamp, detected_state = self._detect_results.get_nowait()
+            except queue.Empty:
+                break
+            # ALWAYS process state change, even if it's the same
+            # This is crucial for the sleep logic to work properly
+            self.posture_times.append(timestamp)
+            self.posture_states.append(POSTURE_CODES.get(detected_state, -1))
+            if self.detector and self.is_running:
+                try:
+                    self._state_queue.put_nowait(detected_state)
+                except queue.Full:
+                    # The worker is behind; newer detections will follow, so drop this one
+                    self.logger.debug("State change queue full, dropping detection")
+        
+        if self.is_running:
+            self.root.after(33, self._drain_detections)
+
+    def _state_worker(self):
+        """Apply queued state changes to the current detector"""
+        while True:
+            state = self._state_queue.get()
+            detector = self.detector
+            if not detector:
+                continue
+            try:
+                detector.handle_state_change(state)
+            except Exception as e:
+                self.logger.error(f"Error handling state change: {e}")
+
     def _display_frame(self):
-        """This method is no longer needed as the display is handled in the processing loop."""
-        pass
+        """Paste the newest preview frame into the persistent Tk photo"""
+        with self.frame_lock:
+            # Holding the lock keeps the loop from flipping this buffer back to itself mid-paste
+            if self._frame_seq != self._shown_seq:
+                self._shown_seq = self._frame_seq
+                self._tk_photo.paste(Image.fromarray(self._preview_bufs[self._write_idx ^ 1]))
+        
+        if self.is_running:
+            self.root.after(int(config.DISPLAY_INTERVAL * 1000), self._display_frame)
 
     def _update_state_display(self, state):
         """Update the current state display with Windows-specific styling"""
         try:
-            state_text = f"State: {state.value}"
+            state_text = f"State: {STATE_TEXT[state]}"
             
             # Update with fade effect
             self.current_state_label.config(text=state_text)
@@ -501,14 +683,15 @@ class SlouchingDetectorGUI:
 
     def _initialization_successful(self):
         """Update GUI after successful initialization"""
-        print("🔧 DEBUG: _initialization_successful called")
+        self._debug_print("_initialization_successful called")
         self.status_label.config(text="🟢 Monitoring...", foreground=self.colors["accent_green"])
         self.stop_button.config(state=tk.NORMAL)
         self.logger.info("Initialization successful, monitoring started.")
+        self._drain_detections()
         
     def _initialization_failed(self, reason):
         """Update GUI after failed initialization"""
-        print(f"🔧 DEBUG: _initialization_failed called with reason: {reason}")
+        self._debug_print(f"_initialization_failed called with reason: {reason}")
         self.logger.error(f"Error: {reason}")
         self.status_label.config(text=f"Error: {reason}", foreground=self.colors["accent_red"])
         self.start_button.config(state=tk.NORMAL)
@@ -520,9 +703,9 @@ class SlouchingDetectorGUI:
 
     def stop_monitoring(self):
         """Stop the slouching detector without blocking the GUI."""
-        print("🔧 DEBUG: stop_monitoring called (non-blocking)")
+        self._debug_print("stop_monitoring called (non-blocking)")
         if not self.is_running and self.detector_thread is None:
-            print("🔧 DEBUG: Already stopped, returning")
+            self._debug_print("Already stopped, returning")
             return
 
         # Disable buttons to prevent multiple clicks
@@ -537,67 +720,66 @@ class SlouchingDetectorGUI:
         
         self.logger.info("⏹️ Stopping monitoring...")
         
-        # Start polling to check when the thread has finished
-        self.root.after(100, self._check_if_stopped)
-
-    def _check_if_stopped(self):
-        """Polls to see if the detector thread has finished."""
-        if self.detector_thread and self.detector_thread.is_alive():
-            # If still alive, check again in 100ms
-            self.root.after(100, self._check_if_stopped)
-        else:
-            # Thread has finished, perform final cleanup in the main thread
-            print("🔧 DEBUG: Detector thread has finished. Cleaning up.")
-            self.detector_thread = None # Clear the thread reference
-            self._cleanup_detector()
-            
-            self.status_label.config(text="🔴 Stopped", foreground=self.colors["accent_red"])
-            self.current_state_label.config(text="Not monitoring", foreground=self.colors["text_secondary"])
-            self.start_button.config(state=tk.NORMAL)
-            # Keep stop button disabled
-            
-            self.logger.info("Monitoring stopped successfully.")
-            print("🔧 DEBUG: stop_monitoring flow completed.")
-            
-            # Display posture analysis
-            self._display_posture_analysis()
+        # The detector thread schedules _on_stopped_final as it exits; finish now if it already has
+        self._stop_requested = True
+        if self._stopped_event.is_set():
+            self._on_stopped_final()
+
+    def _on_stopped_final(self):
+        """Finish a requested stop once the detector thread has exited"""
+        if not (self._stop_requested and self._stopped_event.is_set()):
+            return
+        self._stop_requested = False
+        
+        # Thread has finished, perform final cleanup in the main thread
+        self._debug_print("Detector thread has finished. Cleaning up.")
+        self.detector_thread = None # Clear the thread reference
+        self._drain_detections() # Record results that arrived after the last poll
+        self._cleanup_detector()
+        
+        self.status_label.config(text="🔴 Stopped", foreground=self.colors["accent_red"])
+        self.current_state_label.config(text="Not monitoring", foreground=self.colors["text_secondary"])
+        self.start_button.config(state=tk.NORMAL)
+        # Keep stop button disabled
+        
+        self.logger.info("Monitoring stopped successfully.")
+        self._debug_print("stop_monitoring flow completed.")
+        
+        # Display posture analysis
+        self._display_posture_analysis()
         
     def _cleanup_detector(self):
         """Release detector resources"""
-        print("🔧 DEBUG: _cleanup_detector called")
+        self._debug_print("_cleanup_detector called")
         with self.detector_lock:
             if self.detector:
                 # Camera and OpenCV cleanup is handled in the thread's finally block
                 self.detector = None
-                print("🔧 DEBUG: Detector instance cleaned up")
+                self._debug_print("Detector instance cleaned up")
             else:
-                print("🔧 DEBUG: Detector was already None")
+                self._debug_print("Detector was already None")
             
             # Clear the latest frame
             with self.frame_lock:
-                self.latest_frame = None
-                print("🔧 DEBUG: Latest frame cleared")
+                self._preview_bufs[self._write_idx ^ 1].fill(0)
+                self._debug_print("Latest frame cleared")
 
     def _display_posture_analysis(self):
         """Calculate and display posture analysis graph"""
-        if not self.posture_history:
+        if not self.posture_times:
             self.logger.info("No posture data to analyze.")
             return
 
         self.logger.info("Generating posture analysis...")
 
-        proper_time = 0
-        improper_time = 0
-
-        for i in range(len(self.posture_history) - 1):
-            start_time, state = self.posture_history[i]
-            end_time, _ = self.posture_history[i+1]
-            duration = (end_time - start_time).total_seconds()
+        # Each state lasts until the next detection
+        times = np.asarray(self.posture_times, dtype=np.float64)
+        states = np.asarray(self.posture_states, dtype=np.int8)
+        durations = np.diff(times)
+        good_mask = states[:-1] == POSTURE_CODES[PostureState.GOOD_POSTURE]
 
-            if state == PostureState.GOOD_POSTURE:
-                proper_time += duration
-            else: # Any other state is considered improper for simplicity
-                improper_time += duration
+        proper_time = durations[good_mask].sum()
+        improper_time = durations[~good_mask].sum() # Any other state is considered improper for simplicity
 
         total_time = proper_time + improper_time
         if total_time == 0:
@@ -607,38 +789,67 @@ class SlouchingDetectorGUI:
         proper_percent = (proper_time / total_time) * 100
         improper_percent = (improper_time / total_time) * 100
 
-        # Create Matplotlib Pie Chart
-        fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
-        fig.patch.set_facecolor(self.colors["background"])
-        ax.set_facecolor(self.colors["background"])
-
+        # Update the template Pie Chart in place
         labels = [f'Proper ({proper_percent:.1f}%)', f'Improper ({improper_percent:.1f}%)']
         sizes = [proper_percent, improper_percent]
-        colors = [self.colors["accent_green"], self.colors["accent_red"]]
         explode = (0.1, 0) if proper_percent > improper_percent else (0, 0.1)
+        self._update_analysis_pie(sizes, labels, explode)
 
-        ax.pie(sizes, explode=explode, labels=labels, autopct='%1.1f%%', shadow=True, startangle=90,
-               colors=colors, pctdistance=0.85,
-               textprops={'color': self.colors["foreground"], 'fontweight': 'bold'})
+        # Blit the pie over the cached background and show the result as a static image
+        self._analysis_agg.restore_region(self._analysis_background)
+        for artist in self._pie_artists:
+            self._analysis_ax.draw_artist(artist)
+        self._analysis_photo.paste(Image.fromarray(np.asarray(self._analysis_agg.buffer_rgba())))
+        self.analysis_frame.grid()
 
-        # Draw a circle at the center to make it a donut chart
-        centre_circle = plt.Circle((0,0),0.70,fc=self.colors["background"])
-        fig.gca().add_artist(centre_circle)
+        self.logger.info("Analysis complete.")
 
-        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
-        plt.title("Posture Summary", color=self.colors["foreground"])
+    def _build_analysis_pie(self):
+        """Build the donut chart once; sessions only move its wedges and rewrite its text"""
+        ax = self._analysis_ax
+        ax.set_facecolor(self.colors["background"])
 
-        # Embed in Tkinter
-        self.analysis_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
-        
-        if self.analysis_canvas:
-            self.analysis_canvas.get_tk_widget().destroy()
+        colors = [self.colors["accent_green"], self.colors["accent_red"]]
+        self._pie_wedges, self._pie_labels, self._pie_pcts = ax.pie(
+            [50, 50], labels=['', ''], autopct='%1.1f%%', shadow=True, startangle=90,
+            colors=colors, pctdistance=0.85,
+            textprops={'color': self.colors["foreground"], 'fontweight': 'bold'})
 
-        self.analysis_canvas = FigureCanvasTkAgg(fig, master=self.analysis_frame)
-        self.analysis_canvas.draw()
-        self.analysis_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Draw a circle at the center to make it a donut chart
+        centre_circle = Circle((0,0),0.70,fc=self.colors["background"])
+        ax.add_artist(centre_circle)
 
-        self.logger.info("Analysis complete.")
+        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
+        ax.set_title("Posture Summary", color=self.colors["foreground"])
+
+        # Render the static parts once; the pie itself (wedges, shadows, hole, texts) is blitted over them
+        self._pie_artists = sorted([*ax.patches, *ax.texts], key=lambda artist: artist.get_zorder())
+        for artist in self._pie_artists:
+            artist.set_animated(True)
+        self._analysis_agg.draw()
+        self._analysis_background = self._analysis_agg.copy_from_bbox(self._analysis_fig.bbox)
+
+    def _update_analysis_pie(self, sizes, labels, explode):
+        """Reposition the template wedges and texts the way ax.pie would lay them out"""
+        theta1 = 90  # startangle
+        for wedge, label, pct_text, size, text, offset in zip(
+                self._pie_wedges, self._pie_labels, self._pie_pcts, sizes, labels, explode):
+            theta2 = theta1 + 360 * size / 100
+            mid = np.deg2rad((theta1 + theta2) / 2)
+            center = (offset * np.cos(mid), offset * np.sin(mid))
+
+            wedge.set_center(center)
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+
+            label_x = center[0] + 1.1 * np.cos(mid)  # labeldistance
+            label.set_position((label_x, center[1] + 1.1 * np.sin(mid)))
+            label.set_horizontalalignment('left' if label_x > 0 else 'right')
+            label.set_text(text)
+
+            pct_text.set_position((center[0] + 0.85 * np.cos(mid), center[1] + 0.85 * np.sin(mid)))
+            pct_text.set_text(f'{size:.1f}%')
+            theta1 = theta2
 
     def _trigger_shutdown(self):
         """Thread-safe method to trigger application shutdown after sleep."""
@@ -650,18 +861,25 @@ class SlouchingDetectorGUI:
         # Schedule immediate shutdown without delay
         self.root.after(0, self._force_close)
 
+    def _get_brightness_controller(self):
+        """Return a shared brightness controller, reusing the detector's when there is one"""
+        detector = self.detector
+        if detector:
+            return detector.brightness_controller
+        if self._bc is None:
+            self._bc = connect_brightness_controller()
+        return self._bc
+
     def _update_brightness_display_safe(self):
         """Update brightness display in GUI safely (non-blocking)"""
         def _update_brightness():
             try:
-                from brightness_controller import BrightnessController
-                bc = BrightnessController()
-                current = bc.get_current_brightness()
+                current = self._get_brightness_controller().get_current_brightness()
                 # Schedule GUI update in main thread
-                self.root.after(0, lambda: self.brightness_label.config(text=f"Brightness: {current}%"))
+                self.root.after(0, lambda: self._set_label(self.brightness_label, f"Brightness: {current}%"))
             except Exception as e:
                 # Schedule GUI update in main thread
-                self.root.after(0, lambda: self.brightness_label.config(text="Brightness: Unknown"))
+                self.root.after(0, lambda: self._set_label(self.brightness_label, "Brightness: Unknown"))
         
         # Run brightness check in background thread to avoid blocking
         threading.Thread(target=_update_brightness, daemon=True).start()
@@ -669,12 +887,20 @@ class SlouchingDetectorGUI:
     def _update_brightness_display(self):
         """Update brightness display in GUI"""
         try:
-            from brightness_controller import BrightnessController
-            bc = BrightnessController()
-            current = bc.get_current_brightness()
-            self.brightness_label.config(text=f"Brightness: {current}%")
+            current = self._get_brightness_controller().get_current_brightness()
+            self._set_label(self.brightness_label, f"Brightness: {current}%")
         except Exception as e:
-            self.brightness_label.config(text="Brightness: Unknown")
+            self._set_label(self.brightness_label, "Brightness: Unknown")
+
+    def _set_label(self, label, text, foreground=None):
+        """Update a label's text and color, skipping the Tk call when nothing changed"""
+        if self._label_cache.get(label) == (text, foreground):
+            return
+        if foreground is None:
+            label.config(text=text)
+        else:
+            label.config(text=text, foreground=foreground)
+        self._label_cache[label] = (text, foreground)
 
     def on_closing(self):
         """Handle window closing"""
@@ -683,10 +909,13 @@ class SlouchingDetectorGUI:
             # Give it a moment to stop
             self.root.after(1000, self._force_close)
         else:
-            self.root.destroy()
+            self._force_close()
     
     def _force_close(self):
         """Force close the application"""
+        self._detect_pool.shutdown(wait=False)
+        if self._bc is not None:
+            self._bc.close()
         self.root.destroy()
 
     def connect_spotify(self):
@@ -696,12 +925,11 @@ class SlouchingDetectorGUI:
         def _connect():
             try:
                 # Initialize Spotify controller
-                from spotify_controller import SpotifyController
                 self.spotify_controller = SpotifyController()
                 
                 # This will now handle the full auth flow
                 if self.spotify_controller.initialize():
-                    user = self.spotify_controller.sp.current_user()
+                    user = self.spotify_controller.get_current_user()
                     if user:
                         self.logger.info(f"Connected to Spotify as: {user['display_name']}")
                         self.root.after(0, self._spotify_connected)
@@ -713,7 +941,6 @@ class SlouchingDetectorGUI:
                     
             except Exception as e:
                 self.logger.error(f"Failed to connect to Spotify: {e}")
-                import traceback
                 traceback.print_exc()
         
         # Run connection in background thread
@@ -729,25 +956,43 @@ class SlouchingDetectorGUI:
     def spotify_play(self):
         """Play music on Spotify"""
         if hasattr(self, 'spotify_controller') and self.spotify_controller.is_initialized:
-            def _play():
-                success = self.spotify_controller.play_music()
-                if success:
-                    self.root.after(100, self._update_current_track)
-            threading.Thread(target=_play, daemon=True).start()
+            self._request_spotify('play')
         else:
             self.logger.error("Spotify not connected")
     
     def spotify_pause(self):
         """Pause music on Spotify"""
         if hasattr(self, 'spotify_controller') and self.spotify_controller.is_initialized:
-            def _pause():
-                success = self.spotify_controller.pause_music()
-                if success:
-                    self.root.after(100, self._update_current_track)
-            threading.Thread(target=_pause, daemon=True).start()
+            self._request_spotify('pause')
         else:
             self.logger.error("Spotify not connected")
     
+    def _request_spotify(self, action):
+        """Record the latest play/pause intent and make sure a worker will carry it out"""
+        with self._spotify_lock:
+            self._spotify_pending = action
+            if self._spotify_worker_busy:
+                return
+            self._spotify_worker_busy = True
+        threading.Thread(target=self._spotify_worker, daemon=True).start()
+    
+    def _spotify_worker(self):
+        """Run pending play/pause actions, letting bursts of clicks settle for 200ms first"""
+        while True:
+            time.sleep(0.2)
+            with self._spotify_lock:
+                action, self._spotify_pending = self._spotify_pending, None
+                if action is None:
+                    self._spotify_worker_busy = False
+                    return
+            
+            if action == 'play':
+                success = self.spotify_controller.play_music()
+            else:
+                success = self.spotify_controller.pause_music()
+            if success:
+                self.root.after(100, self._update_current_track)
+    
     def _update_current_track(self):
         """Update the current track display"""
         if not hasattr(self, 'spotify_controller') or not self.spotify_controller.is_initialized:
@@ -755,7 +1000,7 @@ class SlouchingDetectorGUI:
         
         def _get_current():
             try:
-                current = self.spotify_controller.sp.current_playback()
+                current = self.spotify_controller.get_current_playback()
                 if current and current['item']:
                     track_name = current['item']['name']
                     artist_name = current['item']['artists'][0]['name']
@@ -764,11 +1009,11 @@ class SlouchingDetectorGUI:
                     status = "▶️" if is_playing else "⏸️"
                     text = f"{status} {track_name} by {artist_name}"
                     
-                    self.root.after(0, lambda: self.current_track_label.config(text=text, foreground=self.colors["foreground"]))
+                    self.root.after(0, lambda: self._set_label(self.current_track_label, text, self.colors["foreground"]))
                 else:
-                    self.root.after(0, lambda: self.current_track_label.config(text="No track playing", foreground=self.colors["text_secondary"]))
+                    self.root.after(0, lambda: self._set_label(self.current_track_label, "No track playing", self.colors["text_secondary"]))
             except Exception as e:
-                self.root.after(0, lambda: self.current_track_label.config(text="Error getting track info", foreground=self.colors["accent_red"]))
+                self.root.after(0, lambda: self._set_label(self.current_track_label, "Error getting track info", self.colors["accent_red"]))
         
         threading.Thread(target=_get_current, daemon=True).start()
 
@@ -0,0 +1,66 @@
+"""
+Posturify brightness daemon
+Owns a single BrightnessController (and its DDC/CI monitor handles) and serves it to
+other processes over a named pipe, so only this process pays for monitor discovery.
+Run with: python posturifyd.py
+"""
+
+import json
+import logging
+import threading
+from multiprocessing.connection import Listener
+from brightness_controller import BrightnessController, DAEMON_ADDRESS
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Operations clients may invoke on the shared controller
+ALLOWED_OPS = frozenset({
+    'get_current_brightness',
+    'set_brightness',
+    'fade_brightness',
+    'request_fade',
+    'restore_brightness',
+    'dim_screen',
+    'brighten_screen',
+})
+
+def handle_client(conn, controller):
+    """Serve requests from one client until it disconnects"""
+    with conn:
+        while True:
+            try:
+                request = json.loads(conn.recv_bytes())
+            except (EOFError, OSError):
+                break
+
+            op = request.get('op')
+            if op not in ALLOWED_OPS:
+                reply = {'error': f"Unsupported operation: {op}"}
+            else:
+                try:
+                    # The controller's brightness_lock serializes writes from all clients
+                    reply = {'result': getattr(controller, op)(*request.get('args', []))}
+                except Exception as e:
+                    reply = {'error': str(e)}
+
+            try:
+                conn.send_bytes(json.dumps(reply).encode())
+            except OSError:
+                break
+
+def serve(address=DAEMON_ADDRESS):
+    """Open the monitors once and accept clients forever"""
+    controller = BrightnessController()
+    with Listener(address) as listener:
+        logger.info(f"Brightness daemon listening on {address}")
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=handle_client, args=(conn, controller), daemon=True).start()
+
+if __name__ == "__main__":
+    try:
+        serve()
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
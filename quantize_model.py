@@ -0,0 +1,77 @@
+"""
+Posturify model quantizer
+Converts the FP32 ONNX posture model to INT8 using ~200 frames from your own webcam
+for calibration, so CPU-only machines run local inference on int8 (VNNI) kernels.
+Run with: python quantize_model.py model_fp32.onnx model_int8.onnx
+Then point LOCAL_MODEL_PATH in .env at the INT8 model.
+"""
+
+import sys
+import time
+import logging
+import onnxruntime as ort
+from onnxruntime.quantization import quantize_static, CalibrationDataReader, QuantFormat, QuantType
+from slouching_detector import open_camera, preprocess_frame, INFERENCE_MAX_SIZE
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Calibration frames to capture, and the gap between them so posture varies a little
+CALIBRATION_FRAMES = 200
+CAPTURE_INTERVAL = 0.1
+
+class WebcamCalibrationReader(CalibrationDataReader):
+    """Feeds preprocessed webcam frames to the quantizer, one per get_next() call"""
+    def __init__(self, model_path, frames):
+        session = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+        model_input = session.get_inputs()[0]
+        height, width = model_input.shape[2:4]
+        size = (width if isinstance(width, int) else INFERENCE_MAX_SIZE,
+                height if isinstance(height, int) else INFERENCE_MAX_SIZE)
+        self.batches = iter([{model_input.name: preprocess_frame(frame, size)} for frame in frames])
+
+    def get_next(self):
+        return next(self.batches, None)
+
+def capture_calibration_frames(count=CALIBRATION_FRAMES):
+    """Grab frames from the same camera the detector uses"""
+    opened = open_camera()
+    if opened is None:
+        raise RuntimeError("Could not open a camera for calibration")
+    cap = opened[0]
+
+    frames = []
+    try:
+        logger.info(f"Capturing {count} calibration frames - sit at your desk as usual, shifting posture now and then")
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if ret:
+                frames.append(frame)
+            time.sleep(CAPTURE_INTERVAL)
+    finally:
+        cap.release()
+    return frames
+
+def quantize(model_fp32, model_int8):
+    """Statically quantize the model to INT8 QDQ with per-channel weights"""
+    frames = capture_calibration_frames()
+    reader = WebcamCalibrationReader(model_fp32, frames)
+
+    logger.info("Quantizing model...")
+    quantize_static(
+        model_fp32,
+        model_int8,
+        reader,
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    logger.info(f"INT8 model written to {model_int8}")
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python quantize_model.py <model_fp32.onnx> <model_int8.onnx>")
+        sys.exit(1)
+    quantize(sys.argv[1], sys.argv[2])
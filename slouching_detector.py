@@ -1,31 +1,245 @@
 import cv2
 import numpy as np
-from inference_sdk import InferenceHTTPClient
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import threading
 import logging
-from datetime import datetime, timedelta
+import base64
+import traceback
+import functools
+import math
+import collections
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 import config
-from brightness_controller import BrightnessController
+from brightness_controller import connect_brightness_controller
 from spotify_controller import SpotifyController
 from system_controller import SystemController
 
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None  # Local inference is optional; the hosted Roboflow API is used without it
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Hosted Roboflow inference endpoint
+ROBOFLOW_API_URL = "https://detect.roboflow.com"
+
+# Frames are shrunk to the model's input scale and JPEG-encoded in memory before upload
+INFERENCE_MAX_SIZE = 416
+INFERENCE_JPEG_QUALITY = 80
+
+# Inference requests allowed in flight at once in run_detection_loop
+MAX_INFLIGHT_INFERENCES = 2
+
+# Cameras to try, in priority order, each with its backends in priority order
+CAMERA_OPTIONS = (
+    (0, (cv2.CAP_DSHOW,   # DirectShow (Windows default)
+         cv2.CAP_MSMF,    # Microsoft Media Foundation
+         cv2.CAP_ANY)),   # Auto-select backend
+    (1, (cv2.CAP_DSHOW,   # Second camera with DirectShow
+         cv2.CAP_ANY)),   # Second camera with auto-select
+)
+
+def preprocess_frame(frame, size):
+    """Turn a BGR frame into the model's (1, 3, H, W) float32 RGB input tensor"""
+    # Resize, BGR->RGB, scale and HWC->CHW in a single pass
+    return cv2.dnn.blobFromImage(frame, scalefactor=1 / 255.0, size=size, swapRB=True, crop=False)
+
+def _try_open_camera(camera_index, backend):
+    """Open one camera/backend combination; returns the capture if it delivers a frame, else None"""
+    cap = None
+    try:
+        logger.info(f"Trying camera {camera_index} with backend {backend}")
+        cap = cv2.VideoCapture(camera_index, backend)
+        if cap.isOpened():
+            # Test if we can actually read a frame
+            ret, test_frame = cap.read()
+            if ret and test_frame is not None:
+                return cap
+    except Exception as e:
+        logger.warning(f"Camera {camera_index} with backend {backend} failed: {e}")
+    if cap:
+        cap.release()
+    return None
+
+def _probe_camera(camera_index, backends):
+    """Try one camera's backends one after another; returns (capture, backend) or None"""
+    for backend in backends:
+        cap = _try_open_camera(camera_index, backend)
+        if cap:
+            return cap, backend
+    return None
+
+def _release_probe(future):
+    """Release a camera opened by a lower-priority probe"""
+    opened = future.result()
+    if opened:
+        opened[0].release()
+
+def open_camera():
+    """Open the highest-priority working camera; returns (capture, camera index, backend) or None"""
+    # Webcams are usually exclusive, so backends of one device are never opened at the same time.
+    # Separate devices are probed in parallel, and the earliest one in CAMERA_OPTIONS that works wins.
+    probe_pool = ThreadPoolExecutor(max_workers=len(CAMERA_OPTIONS))
+    probes = [(camera_index, probe_pool.submit(_probe_camera, camera_index, backends))
+              for camera_index, backends in CAMERA_OPTIONS]
+    chosen = None
+    try:
+        for camera_index, future in probes:
+            opened = future.result()
+            if opened:
+                cap, backend = opened
+                chosen = (cap, camera_index, backend)
+                break
+    finally:
+        # Lower-priority probes may still be running; release whatever they open once they finish
+        for camera_index, future in probes:
+            if chosen is None or camera_index != chosen[1]:
+                future.add_done_callback(_release_probe)
+        probe_pool.shutdown(wait=False)
+    
+    if chosen is None:
+        return None
+    cap = chosen[0]
+    # Set camera properties for better performance and speed
+    # MJPEG first: compressed transfer sustains full frame rate where raw YUV can't
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    cap.set(cv2.CAP_PROP_FPS, 30)  # Higher frame rate
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer for lower latency
+    # Disable auto-exposure and auto-focus for consistent performance
+    cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)  # Manual exposure
+    return chosen
+
+class CaptureWorker:
+    """Grabs camera frames on its own thread, decoding only the ones a consumer asks for"""
+    def __init__(self, cap):
+        self.cap = cap
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 480
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
+        self.buf_a = np.empty((height, width, 3), np.uint8)
+        self.buf_b = np.empty((height, width, 3), np.uint8)
+        self.buffers = [self.buf_a, self.buf_b]
+        self.write_idx = 0
+        self.wanted = False  # A consumer is waiting in latest(); decode the next grab
+        self.fresh = False
+        self.grab_seq = 0  # Frames grabbed so far, for skip()
+        self.lock = threading.Lock()
+        self.frame_ready = threading.Condition(self.lock)
+        self.running = False
+        self.thread = None
+        self._exited = False  # run() has returned and no longer touches the camera
+        self._release_on_exit = False  # stop() timed out, so run() releases the camera itself
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop the thread; True if the caller may release the camera now"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout)
+        with self.lock:
+            if self.thread and not self._exited:
+                # Still blocked in grab(); releasing now would pull the camera out from under it
+                logger.warning("Capture thread did not exit in time; it will release the camera itself")
+                self._release_on_exit = True
+                return False
+        self.thread = None
+        return True
+
+    def run(self):
+        """Keep the camera queue drained; decode a grabbed frame only when one is wanted"""
+        while self.running:
+            if not self.cap.grab():
+                logger.warning("Failed to grab frame from camera, retrying...")
+                time.sleep(0.1)
+                continue
+
+            with self.frame_ready:
+                self.grab_seq += 1
+                if self.wanted:
+                    # The consumer only ever holds the other buffer, so decoding in place is safe
+                    ret, frame = self.cap.retrieve(self.buffers[self.write_idx])
+                    if ret:
+                        # retrieve() reallocates if the camera changed resolution
+                        self.buffers[self.write_idx] = frame
+                        self.wanted = False
+                        self.fresh = True
+                self.frame_ready.notify_all()
+
+        with self.lock:
+            self._exited = True
+            if self._release_on_exit:
+                self.cap.release()
+
+    def skip(self, timeout=1.0):
+        """Let the next frame go by without decoding it; False on timeout"""
+        with self.frame_ready:
+            seq = self.grab_seq
+            return self.frame_ready.wait_for(lambda: self.grab_seq != seq, timeout)
+
+    def latest(self, timeout=1.0):
+        """Decode and return the next frame (no copy), valid until the next call; None on timeout"""
+        with self.frame_ready:
+            self.wanted = True
+            if not self.frame_ready.wait_for(lambda: self.fresh, timeout):
+                return None
+            frame = self.buffers[self.write_idx]
+            self.fresh = False
+            self.write_idx ^= 1
+            return frame
+
 class PostureState(Enum):
     GOOD_POSTURE = "good_posture"
     SLOUCHING = "slouching"
     USER_ABSENT = "user_absent"
 
+# Display names for each state, so overlays don't rebuild them per frame
+STATE_TEXT = {
+    PostureState.GOOD_POSTURE: "Good Posture",
+    PostureState.SLOUCHING: "Slouching",
+    PostureState.USER_ABSENT: "User Absent",
+}
+
+@functools.lru_cache(maxsize=None)
+def status_overlay(state):
+    """Render a state's status text once into a small patch, returned with its top-left frame position"""
+    status_text = f"State: {STATE_TEXT[state]}"
+    font, scale, thickness = cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2
+    (text_w, text_h), baseline = cv2.getTextSize(status_text, font, scale, thickness)
+    pad = thickness
+    patch = np.zeros((text_h + baseline + 2 * pad, text_w + 2 * pad), np.uint8)
+    cv2.putText(patch, status_text, (pad, text_h + pad), font, scale, 255, thickness)
+    # Same placement as drawing at (10, 30) on the full frame
+    return patch, (10 - pad, 30 - text_h - pad)
+
+def draw_status_overlay(gray_frame, state):
+    """Add the cached status text to a grayscale frame in place; only its bounding box is touched"""
+    patch, (x, y) = status_overlay(state)
+    roi = gray_frame[y:y + patch.shape[0], x:x + patch.shape[1]]
+    roi[:] = cv2.add(roi, patch[:roi.shape[0], :roi.shape[1]])
+
 class SlouchingDetector:
     def __init__(self, shutdown_callback=None):
         self.client = None
         self.model_id = None
+        self._local_model = None  # onnxruntime session when LOCAL_MODEL_PATH is set
+        self._local_input_name = None
+        self._local_input_size = None  # (width, height)
+        self._local_classes = []
         self.current_state = PostureState.USER_ABSENT
-        self.last_detection_time = datetime.now()
+        # Timestamps below are time.monotonic() seconds
+        self.last_detection_time = time.monotonic()
         self.user_absent_start = None
         self.monitoring_start_time = None  # Track when monitoring actually started
         self.running = False
@@ -33,25 +247,46 @@ class SlouchingDetector:
         self.state_lock = threading.Lock()
         
         # State change debouncing
-        self.last_state_change_time = datetime.now()
+        self.last_state_change_time = time.monotonic()
         self.state_change_debounce_duration = 0.5  # Reduce to 0.5 seconds for more responsive behavior
         
         # Initialize controllers
-        self.brightness_controller = BrightnessController()
+        self.brightness_controller = connect_brightness_controller()
+        self._last_brightness = None  # Last level successfully written by the state handlers
         self.spotify_controller = SpotifyController()
         self.system_controller = SystemController()
         
-        # Initialize camera
+        # Initialize camera; the standalone loop reads frames through a CaptureWorker
         self.cap = None
+        self._capture = None
+        
+        # Preview window for run_detection_loop
+        self.show_preview = True
+        # Offload the preview's color conversion to OpenCL (iGPU/APU) when the device has it;
+        # only this loop's UMat path reads it, OpenCV's process-wide switch is left alone
+        self._use_opencl = cv2.ocl.haveOpenCL()
+        
+        # Background inference for run_detection_loop
+        self._infer_pool = ThreadPoolExecutor(max_workers=MAX_INFLIGHT_INFERENCES)
+        self._infer_lock = threading.Lock()
+        self._inflight = 0
+        self._infer_seq = 0
+        self._result_lock = threading.Lock()
+        self._handled_seq = 0
+        self._lat_ring = collections.deque(maxlen=10)  # Recent inference latencies (seconds)
         
     def initialize_roboflow(self):
-        """Initialize Roboflow model using inference-sdk"""
+        """Initialize a keep-alive HTTP session for the hosted Roboflow model"""
         try:
-            # Create inference client
-            self.client = InferenceHTTPClient(
-                api_url="https://detect.roboflow.com",
-                api_key=config.ROBOFLOW_API_KEY
-            )
+            # One pooled session for every request, so TCP/TLS connections are reused across frames
+            self.client = requests.Session()
+            # Keep-alive pool sized to the in-flight window. Inference POSTs are safe to resend, so
+            # connection errors and one read/protocol error (e.g. RemoteDisconnected from a keep-alive
+            # socket the server already closed) are retried; urllib3 skips POST unless told otherwise
+            retry = Retry(total=2, connect=2, read=1, allowed_methods=frozenset({"POST"}), backoff_factor=0.1)
+            self.client.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_INFLIGHT_INFERENCES, max_retries=retry))
+            self.client.params = {'api_key': config.ROBOFLOW_API_KEY}
+            self.client.headers['Content-Type'] = 'application/x-www-form-urlencoded'
             
             # Build the correct model ID format: project_id/model_version_id
             if '/' in config.ROBOFLOW_PROJECT:
@@ -61,69 +296,117 @@ class SlouchingDetector:
                 self.model_id = f"{config.ROBOFLOW_PROJECT}/{config.ROBOFLOW_VERSION}"
             
             logger.info(f"Roboflow model initialized successfully for {self.model_id}")
+            
+            # Prefer an on-device copy of the model when one is configured
+            self.initialize_local_model()
             return True
         except Exception as e:
             logger.error(f"Failed to initialize Roboflow: {e}")
             return False
     
+    def initialize_local_model(self):
+        """Load the ONNX export of the model for on-device inference, if configured"""
+        if not config.LOCAL_MODEL_PATH:
+            return False
+        if ort is None:
+            logger.warning("LOCAL_MODEL_PATH is set but onnxruntime is not installed - using the hosted API")
+            return False
+        
+        try:
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            # DirectML uses the GPU where available; the CPU provider is always there
+            providers = [p for p in ('DmlExecutionProvider', 'CPUExecutionProvider') if p in ort.get_available_providers()]
+            self._local_model = ort.InferenceSession(config.LOCAL_MODEL_PATH, sess_options=options, providers=providers)
+            
+            model_input = self._local_model.get_inputs()[0]
+            self._local_input_name = model_input.name
+            # NCHW input; dynamic dimensions come back as names rather than ints
+            height, width = model_input.shape[2:4]
+            self._local_input_size = (width if isinstance(width, int) else INFERENCE_MAX_SIZE,
+                                      height if isinstance(height, int) else INFERENCE_MAX_SIZE)
+            self._local_classes = [name.strip() for name in config.LOCAL_MODEL_CLASSES.split(',') if name.strip()]
+            
+            logger.info(f"Local model loaded from {config.LOCAL_MODEL_PATH} ({self._local_model.get_providers()[0]})")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to load local model, using the hosted API: {e}")
+            self._local_model = None
+            return False
+    
     def initialize_camera(self):
         """Initialize camera with multiple fallback options"""
         try:
-            # Try different camera backends and indices
-            camera_options = [
-                (0, cv2.CAP_DSHOW),  # DirectShow (Windows default)
-                (0, cv2.CAP_MSMF),   # Microsoft Media Foundation
-                (0, cv2.CAP_ANY),    # Auto-select backend
-                (1, cv2.CAP_DSHOW),  # Second camera with DirectShow
-                (1, cv2.CAP_ANY),    # Second camera with auto-select
-            ]
-            
-            for camera_index, backend in camera_options:
-                try:
-                    logger.info(f"Trying camera {camera_index} with backend {backend}")
-                    self.cap = cv2.VideoCapture(camera_index, backend)
-                    
-                    if self.cap.isOpened():
-                        # Test if we can actually read a frame
-                        ret, test_frame = self.cap.read()
-                        if ret and test_frame is not None:
-                            logger.info(f"Camera {camera_index} initialized successfully with backend {backend}")
-                            # Set camera properties for better performance and speed
-                            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                            self.cap.set(cv2.CAP_PROP_FPS, 30)  # Higher frame rate
-                            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer for lower latency
-                            # Disable auto-exposure and auto-focus for consistent performance
-                            self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)  # Manual exposure
-                            return True
-                        else:
-                            self.cap.release()
-                            
-                except Exception as e:
-                    logger.warning(f"Camera {camera_index} with backend {backend} failed: {e}")
-                    if hasattr(self, 'cap') and self.cap:
-                        self.cap.release()
-                    continue
+            opened = open_camera()
+            if opened is None:
+                raise Exception("No working camera found")
             
-            raise Exception("No working camera found")
+            self.cap, camera_index, backend = opened
+            logger.info(f"Camera {camera_index} initialized successfully with backend {backend}")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to initialize any camera: {e}")
             return False
     
+    def _infer_hosted(self, frame):
+        """Run the hosted Roboflow model on a frame; returns the API's result dict"""
+        # Downscale to the model's input scale, keeping aspect ratio
+        height, width = frame.shape[:2]
+        scale = INFERENCE_MAX_SIZE / max(height, width)
+        if scale < 1:
+            frame = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+        
+        # Encode in memory instead of round-tripping through a temp file
+        ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, INFERENCE_JPEG_QUALITY])
+        if not ok:
+            raise ValueError("Failed to encode frame as JPEG")
+        image_b64 = base64.b64encode(jpeg).decode('ascii')
+        
+        logger.debug("🤖 Calling Roboflow inference...")
+        response = self.client.post(f"{ROBOFLOW_API_URL}/{self.model_id}", data=image_b64, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    
+    def _infer_local(self, frame):
+        """Run the local ONNX model on a frame; returns a result dict shaped like the API's"""
+        tensor = preprocess_frame(frame, self._local_input_size)
+        
+        output = np.asarray(self._local_model.run(None, {self._local_input_name: tensor})[0], dtype=np.float32)
+        if output.ndim == 2:
+            # Classification head: (1, num_classes) probabilities or logits
+            scores = output[0]
+            if scores.min() < 0 or not np.isclose(scores.sum(), 1.0, atol=1e-3):
+                scores = np.exp(scores - scores.max())
+                scores /= scores.sum()
+            class_id = int(np.argmax(scores))
+            confidence = float(scores[class_id])
+        else:
+            # YOLOv8-style detection head: (1, 4 + num_classes, boxes); keep the best-scoring box
+            class_scores = output[0, 4:, :]
+            if class_scores.size == 0:
+                return {'predictions': []}
+            class_id, box = np.unravel_index(np.argmax(class_scores), class_scores.shape)
+            confidence = float(class_scores[class_id, box])
+            if confidence < config.CONFIDENCE_THRESHOLD:
+                return {'predictions': []}
+        
+        name = self._local_classes[class_id] if class_id < len(self._local_classes) else str(class_id)
+        return {'predictions': [{'class': name, 'confidence': confidence}]}
+    
     def detect_posture(self, frame):
-        """Detect posture from frame using Roboflow inference SDK"""
+        """Detect posture from frame, on-device when a local model is loaded, otherwise via Roboflow"""
         try:
             logger.debug("🔍 Starting posture detection...")
-            # Save frame temporarily for inference
-            temp_path = "temp_frame.jpg"
-            cv2.imwrite(temp_path, frame)
-            logger.debug(f"📸 Frame saved to {temp_path}")
-            
-            # Get prediction using inference SDK
-            logger.debug("🤖 Calling Roboflow inference...")
-            result = self.client.infer(temp_path, model_id=self.model_id)
-            logger.debug(f"📊 Inference result: {result}")
+            result = None
+            if self._local_model is not None:
+                try:
+                    result = self._infer_local(frame)
+                except Exception as local_error:
+                    logger.warning(f"Local inference failed, falling back to Roboflow: {local_error}")
+            if result is None:
+                result = self._infer_hosted(frame)
+            logger.debug("📊 Inference result: %s", result)
             
             if 'predictions' in result and len(result['predictions']) > 0:
                 # Get the prediction with highest confidence
@@ -157,7 +440,8 @@ class SlouchingDetector:
                 
         except Exception as e:
             logger.error(f"Error in posture detection: {e}")
-            logger.debug(f"Exception details: {traceback.format_exc()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Exception details: %s", traceback.format_exc())
             return PostureState.USER_ABSENT
     
     def handle_state_change(self, new_state):
@@ -171,11 +455,11 @@ class SlouchingDetector:
                 new_state = PostureState.USER_ABSENT
         
         # Add debouncing to prevent rapid state changes
-        current_time = datetime.now()
-        time_since_last_change = (current_time - self.last_state_change_time).total_seconds()
+        current_time = time.monotonic()
+        time_since_last_change = current_time - self.last_state_change_time
         
         # Log every state detection for debugging (after ensuring new_state is an enum)
-        logger.debug(f"State detection: {new_state.value} (current: {self.current_state.value})")
+        logger.debug("State detection: %s (current: %s)", new_state.value, self.current_state.value)
         
         # If state changes, log it and perform initial actions.
         if new_state != self.current_state:
@@ -193,20 +477,30 @@ class SlouchingDetector:
                     # This is the first time we detect the user is absent
                     self.handle_user_absent()
             else:
-                logger.debug(f"State change ignored due to debouncing: {self.current_state} -> {new_state} (time since last change: {time_since_last_change:.1f}s)")
+                logger.debug("State change ignored due to debouncing: %s -> %s (time since last change: %.1fs)", self.current_state, new_state, time_since_last_change)
         
         # IMPORTANT: Always check user absent state, even if no state change
         # This ensures the sleep timer continues to run
         elif new_state == PostureState.USER_ABSENT:
             self.handle_user_absent()
     
+    def _set_brightness(self, level):
+        """Set brightness unless the state handlers already applied this level"""
+        if level == self._last_brightness:
+            return True
+        # Only remember levels that were actually written, so a failed write is retried
+        if self.brightness_controller.set_brightness(level):
+            self._last_brightness = level
+            return True
+        return False
+    
     def handle_good_posture(self):
         """Handle good posture state - Windows optimized"""
         logger.info("Good posture detected - Setting full brightness and playing music")
         
         # Use immediate brightness setting for responsive behavior
         logger.info(f"Setting brightness to {config.NORMAL_BRIGHTNESS}%")
-        self.brightness_controller.set_brightness(config.NORMAL_BRIGHTNESS)
+        self._set_brightness(config.NORMAL_BRIGHTNESS)
         logger.info(f"Brightness set to {config.NORMAL_BRIGHTNESS}%")
         
         # Start music
@@ -223,7 +517,7 @@ class SlouchingDetector:
         
         # Set brightness to configured slouching level (from config)
         logger.info(f"Setting brightness to {config.SLOUCHING_BRIGHTNESS}%")
-        self.brightness_controller.set_brightness(config.SLOUCHING_BRIGHTNESS)
+        self._set_brightness(config.SLOUCHING_BRIGHTNESS)
         logger.info(f"Brightness set to {config.SLOUCHING_BRIGHTNESS}%")
         
         # Pause music
@@ -236,33 +530,39 @@ class SlouchingDetector:
     
     def handle_user_absent(self):
         """Handle user absent state - Windows optimized"""
+        # Already dimmed and still inside the sleep timeout: nothing to do until it expires
+        absent_start = self.user_absent_start
+        if (absent_start is not None and self._last_brightness == config.ABSENT_BRIGHTNESS
+                and time.monotonic() - absent_start < config.USER_ABSENT_TIMEOUT):
+            return
+        
         # This function is now guarded by a lock to prevent race conditions
         with self.state_lock:
             logger.info("User absent detected")
             
             # Check if we're in the 10-second grace period after monitoring started
-            if self.monitoring_start_time:
-                grace_period_elapsed = (datetime.now() - self.monitoring_start_time).total_seconds()
+            if self.monitoring_start_time is not None:
+                grace_period_elapsed = time.monotonic() - self.monitoring_start_time
                 if grace_period_elapsed < 10:
-                    logger.debug(f"Grace period active ({grace_period_elapsed:.1f}s / 10s), skipping sleep check")
+                    logger.debug("Grace period active (%.1fs / 10s), skipping sleep check", grace_period_elapsed)
                     return
             
             if self.user_absent_start is None:
-                self.user_absent_start = datetime.now()
+                self.user_absent_start = time.monotonic()
                 # Set brightness to a dim level immediately instead of fading
-                self.brightness_controller.set_brightness(30)
-                logger.info("User absent - brightness dimmed to 30%")
+                self._set_brightness(config.ABSENT_BRIGHTNESS)
+                logger.info("User absent - brightness dimmed to %s%%", config.ABSENT_BRIGHTNESS)
             
-            # Check if user has been absent for too long (3 seconds for testing)
+            # Check if user has been absent for too long
             if self.user_absent_start is not None:  # Safety check
-                time_absent = (datetime.now() - self.user_absent_start).total_seconds()
-                logger.debug(f"User absent for {time_absent:.1f} seconds")
+                time_absent = time.monotonic() - self.user_absent_start
+                logger.debug("User absent for %.1f seconds", time_absent)
                 
-                if time_absent >= 3:  # 3 seconds for testing as requested
-                    logger.info("User absent for 3+ seconds - Putting Windows system to sleep")
+                if time_absent >= config.USER_ABSENT_TIMEOUT:
+                    logger.info("User absent for %s+ seconds - Putting Windows system to sleep", config.USER_ABSENT_TIMEOUT)
                     
                     # Set brightness to 0 before sleep
-                    self.brightness_controller.set_brightness(0)
+                    self._set_brightness(0)
                     
                     # Put system to sleep
                     self.system_controller.sleep_system()
@@ -275,38 +575,95 @@ class SlouchingDetector:
                         # Trigger shutdown callback
                         threading.Thread(target=self.shutdown_callback, daemon=True).start()
     
+    def _submit_inference(self, frame):
+        """Run detect_posture on the inference pool; the result goes to _on_infer_result"""
+        with self._infer_lock:
+            self._inflight += 1
+            self._infer_seq += 1
+            seq = self._infer_seq
+        future = self._infer_pool.submit(self._timed_detect_posture, frame)
+        future.add_done_callback(functools.partial(self._on_infer_result, seq))
+    
+    def _timed_detect_posture(self, frame):
+        """detect_posture, recording its latency for _inflight_limit"""
+        start = time.monotonic()
+        try:
+            return self.detect_posture(frame)
+        finally:
+            self._lat_ring.append(time.monotonic() - start)
+    
+    def _inflight_limit(self):
+        """Requests needed in flight to get one result per DETECTION_INTERVAL at the recent latency"""
+        if not self._lat_ring:
+            return 1
+        if config.DETECTION_INTERVAL <= 0:
+            return MAX_INFLIGHT_INFERENCES
+        avg_latency = sum(self._lat_ring) / len(self._lat_ring)
+        return min(MAX_INFLIGHT_INFERENCES, max(1, math.ceil(avg_latency / config.DETECTION_INTERVAL)))
+    
+    def _on_infer_result(self, seq, future):
+        """Apply an inference result unless a newer frame's result already has been"""
+        with self._infer_lock:
+            self._inflight -= 1
+        if not self.running:
+            return
+        
+        # Serialize state changes and drop results that arrive out of order
+        with self._result_lock:
+            if seq <= self._handled_seq:
+                return
+            self._handled_seq = seq
+            try:
+                detected_state = future.result()
+                self.handle_state_change(detected_state)
+            except Exception as e:
+                logger.error(f"Error handling inference result: {e}")
+                return
+            
+            # Update last detection time
+            self.last_detection_time = time.monotonic()
+    
     def run_detection_loop(self):
         """Main detection loop"""
+        next_submit = 0.0
         while self.running:
             try:
-                ret, frame = self.cap.read()
-                if not ret:
-                    logger.warning("Failed to read frame from camera")
+                # Submit only with a free inference slot once the detection interval has passed
+                submit_due = self._inflight < self._inflight_limit() and time.monotonic() >= next_submit
+                if not (submit_due or self.show_preview):
+                    # Nobody needs this frame; let it go by without decoding it
+                    self._capture.skip()
                     continue
                 
-                # Detect posture
-                detected_state = self.detect_posture(frame)
-                self.handle_state_change(detected_state)
+                frame = self._capture.latest()
+                if frame is None:
+                    logger.warning("No frame from camera in the last second")
+                    continue
                 
-                # Update last detection time
-                self.last_detection_time = datetime.now()
+                if submit_due:
+                    # Detect posture while the loop keeps capturing
+                    next_submit = time.monotonic() + config.DETECTION_INTERVAL
+                    # The worker reuses its buffers, so inference gets its own copy
+                    self._submit_inference(frame.copy())
+                
+                # The preview is drawn and pumped on every frame so the window stays responsive
+                if not self.show_preview:
+                    continue
                 
                 # Convert frame to black and white for display
-                gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                if self._use_opencl:
+                    gray_frame = cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2GRAY).get()
+                else:
+                    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
                 
-                # Add status text overlay on the black and white frame
-                status_text = f"State: {detected_state.replace('_', ' ').title()}"
-                cv2.putText(gray_frame, status_text, (10, 30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+                # Add the cached status text overlay on the black and white frame
+                draw_status_overlay(gray_frame, self.current_state)
                 
                 # Display black and white frame
                 cv2.imshow('Slouching Detector - B&W', gray_frame)
                 if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
                 
-                # Wait before next detection
-                time.sleep(config.DETECTION_INTERVAL)
-                
             except Exception as e:
                 logger.error(f"Error in detection loop: {e}")
                 time.sleep(1)
@@ -330,9 +687,13 @@ class SlouchingDetector:
         # Start detection
         self.running = True
         # Set monitoring start time for grace period
-        self.monitoring_start_time = datetime.now()
+        self.monitoring_start_time = time.monotonic()
         logger.info("Monitoring started - 10-second grace period active before sleep logic")
         
+        # Capture on its own thread so inference and display never wait on the camera
+        self._capture = CaptureWorker(self.cap)
+        self._capture.start()
+        
         try:
             self.run_detection_loop()
         except KeyboardInterrupt:
@@ -347,12 +708,21 @@ class SlouchingDetector:
         logger.info("Stopping Slouching Detector...")
         self.running = False
         
-        if self.cap:
+        # Let in-flight inferences finish so none lands after brightness is restored
+        self._infer_pool.shutdown(wait=True)
+        
+        # The capture thread must be out of grab() before the camera is released;
+        # if it is stuck there it releases the camera itself once it gets out
+        camera_free = self._capture.stop() if self._capture else True
+        self._capture = None
+        
+        if camera_free and self.cap:
             self.cap.release()
         cv2.destroyAllWindows()
         
-        # Restore normal brightness
+        # Restore normal brightness, then release the monitor handles and fade thread
         self.brightness_controller.set_brightness(config.NORMAL_BRIGHTNESS)
+        self.brightness_controller.close()
 
 if __name__ == "__main__":
     detector = SlouchingDetector()
@@ -1,15 +1,78 @@
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+import os
+import time
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import config
 
 logger = logging.getLogger(__name__)
 
+# OAuth scopes requested at sign-in
+SPOTIFY_SCOPE = "user-read-playback-state,user-modify-playback-state,user-read-currently-playing,user-read-recently-played,user-top-read,user-library-read,playlist-read-private"
+
+# Account products that include playback control
+_PREMIUM_PRODUCTS = frozenset({'premium', 'premium_student', 'premium_family', 'premium_duo'})
+
+# How long the cached user profile is trusted before re-fetching (catches plan changes)
+USER_CACHE_TTL = 3600
+
+# Device topology rarely changes mid-session; reuse the device list for this long
+DEVICES_CACHE_TTL = 30
+
+# Back-to-back play/pause decisions share one playback fetch within this window
+PLAYBACK_CACHE_TTL = 1.0
+
+# OAuth token cache on disk; kept in memory while running and written back on refresh
+TOKEN_CACHE_PATH = "./.spotify_cache"
+
+# Premium check result kept across launches, next to the OAuth token cache
+PREMIUM_CACHE_PATH = "./.spotify_premium_cache"
+PREMIUM_CACHE_TTL = 7 * 86400
+
+def _write_json_atomic(path, data):
+    """Write JSON to a temp file and swap it in, so a crash never leaves a half-written cache"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def _token_owner(token_info):
+    """Fingerprint the signed-in account by its refresh token, so a cache saved for one user is never reused for another"""
+    refresh_token = (token_info or {}).get('refresh_token')
+    if not refresh_token:
+        return None
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+def _build_session():
+    """One keep-alive connection pool for the API and token refreshes, backing off on 429/5xx"""
+    retry = Retry(
+        total=3,
+        read=False,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'POST', 'PUT', 'DELETE'}),
+        backoff_factor=0.3,
+        respect_retry_after_header=True,
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry))
+    return session
+
 class SpotifyController:
     def __init__(self):
         self.sp = None
         self.is_initialized = False
         self.current_playback = None
+        self._pb_ts = 0.0  # time.monotonic() of the current_playback fetch; 0 forces a refetch
+        self._user_cache = None  # current_user() response, fetched at initialize or lazily on a warm start
+        self._user_cache_t = 0.0  # time.monotonic() of that fetch
+        self._devices_cache = None  # devices() response
+        self._devices_cache_t = 0.0
+        self._last_volume = None  # Last volume successfully set through set_volume
+        self._api_error = None  # spotipy.exceptions.SpotifyException, bound once spotipy is imported
     
     def initialize(self):
         """Initialize Spotify client with detailed logging"""
@@ -17,28 +80,65 @@ class SpotifyController:
             return True
             
         logger.info("Attempting to initialize Spotify...")
+        # spotipy is only imported once music control is actually used
         try:
-            scope = "user-read-playback-state,user-modify-playback-state,user-read-currently-playing,user-read-recently-played,user-top-read,user-library-read,playlist-read-private"
+            import spotipy
+            from spotipy.oauth2 import SpotifyOAuth
+            from spotipy.cache_handler import CacheFileHandler, MemoryCacheHandler
+        except ImportError:
+            logger.error("spotipy is not installed - music control will be disabled.")
+            return False
+        self._api_error = spotipy.exceptions.SpotifyException
+        
+        try:
+            session = _build_session()
+            
+            # spotipy consults the token cache on every request; read the file once and serve it from memory
+            cache_handler = MemoryCacheHandler(token_info=CacheFileHandler(cache_path=TOKEN_CACHE_PATH).get_cached_token())
+            save_in_memory = cache_handler.save_token_to_cache
+            
+            def save_token(token_info):
+                # Only new or refreshed tokens reach the disk
+                save_in_memory(token_info)
+                try:
+                    _write_json_atomic(TOKEN_CACHE_PATH, token_info)
+                except OSError as e:
+                    logger.warning("Could not save Spotify token: %s", e)
+            cache_handler.save_token_to_cache = save_token
             
             # Set a higher timeout for the auth manager
             auth_manager = SpotifyOAuth(
                 client_id=config.SPOTIFY_CLIENT_ID,
                 client_secret=config.SPOTIFY_CLIENT_SECRET,
                 redirect_uri=config.SPOTIFY_REDIRECT_URI,
-                scope=scope,
+                scope=SPOTIFY_SCOPE,
                 open_browser=True, # Explicitly open browser
-                cache_path="./.spotify_cache" # Ensure cache is local
+                cache_handler=cache_handler, # Token cache stays local (TOKEN_CACHE_PATH)
+                requests_session=session
             )
             
-            self.sp = spotipy.Spotify(auth_manager=auth_manager)
+            self.sp = spotipy.Spotify(auth_manager=auth_manager, requests_session=session)
             
-            # Test connection by fetching user info
-            user = self.sp.current_user()
+            # Warm start: a recent Premium check for this token's account skips the profile lookups;
+            # the full profile is then fetched lazily by get_current_user()
+            cached = self._load_premium_cache(auth_manager)
+            if cached:
+                user = {'display_name': cached['display_name']}
+            else:
+                # Test connection by fetching user info
+                user = self.sp.current_user()
+                self._user_cache = user
+                self._user_cache_t = time.monotonic()
             if user and 'display_name' in user:
-                logger.info(f"Spotify successfully initialized for user: {user['display_name']}")
+                logger.info("Spotify successfully initialized for user: %s", user['display_name'])
+                self.is_initialized = True
                 
-                # Check Premium status
-                premium_status = self.check_premium_status()
+                # Check Premium status, remembering it for the next launches
+                if cached:
+                    premium_status = cached['premium']
+                else:
+                    premium_status = self.check_premium_status(user)
+                    self._save_premium_cache(auth_manager, user, premium_status)
                 if premium_status is True:
                     logger.info("Spotify Premium detected - Music control enabled")
                 elif premium_status is False:
@@ -46,38 +146,95 @@ class SpotifyController:
                 else:
                     logger.info("Spotify Premium status unknown - Assuming Premium for music control")
                 
-                self.is_initialized = True
                 return True
             else:
                 logger.error("Spotify authentication failed: Could not retrieve user information.")
                 self.is_initialized = False
                 return False
                 
-        except spotipy.exceptions.SpotifyException as e:
-            logger.error(f"Spotify API Error during initialization: {e}")
+        except self._api_error as e:
+            logger.error("Spotify API Error during initialization: %s", e)
             logger.info("Please check your Spotify API credentials in .env and ensure you have an internet connection.")
             self.is_initialized = False
             return False
         except Exception as e:
             import traceback
-            logger.error(f"An unexpected error occurred during Spotify initialization: {e}")
+            logger.error("An unexpected error occurred during Spotify initialization: %s", e)
             logger.error(traceback.format_exc())
             logger.info("Music control will be disabled.")
             self.is_initialized = False
             return False
     
+    def _load_premium_cache(self, auth_manager):
+        """Return the saved Premium check if it is recent and belongs to the account of the still-usable cached token"""
+        try:
+            with open(PREMIUM_CACHE_PATH) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if time.time() - cached.get('ts', 0) > PREMIUM_CACHE_TTL:
+            return None
+        # validate_token refreshes an expired token; None means a full sign-in is needed
+        token_info = auth_manager.validate_token(auth_manager.cache_handler.get_cached_token())
+        if not token_info:
+            return None
+        owner = _token_owner(token_info)
+        if owner is None or cached.get('token_owner') != owner:
+            return None
+        return cached
+    
+    def _save_premium_cache(self, auth_manager, user, premium_status):
+        """Persist the Premium check, tagged with the current token's account, so later launches can skip it"""
+        owner = _token_owner(auth_manager.cache_handler.get_cached_token())
+        if owner is None:
+            return
+        try:
+            _write_json_atomic(PREMIUM_CACHE_PATH, {
+                'token_owner': owner,
+                'user_id': user.get('id'),
+                'display_name': user['display_name'],
+                'premium': premium_status,
+                'ts': time.time(),
+            })
+        except OSError as e:
+            logger.warning("Could not save Spotify Premium status: %s", e)
+    
     def get_current_playback(self):
         """Get current playback status"""
         if not self.is_initialized:
             return None
         
+        now = time.monotonic()
+        if self._pb_ts and now - self._pb_ts < PLAYBACK_CACHE_TTL:
+            return self.current_playback
+        
         try:
             self.current_playback = self.sp.current_playback()
+            self._pb_ts = now
             return self.current_playback
         except Exception as e:
-            logger.error(f"Failed to get current playback: {e}")
+            logger.error("Failed to get current playback: %s", e)
             return None
     
+    def _get_devices(self):
+        """Return the available devices, re-fetching once the cached list is older than DEVICES_CACHE_TTL"""
+        if self._devices_cache is None or time.monotonic() - self._devices_cache_t > DEVICES_CACHE_TTL:
+            self._devices_cache = self.sp.devices()
+            self._devices_cache_t = time.monotonic()
+        return self._devices_cache
+    
+    def _fetch_state(self):
+        """Return (playback, devices); devices are only looked up when nothing is playing"""
+        current = self.get_current_playback()
+        devices = self._get_devices() if current is None else None
+        return current, devices
+    
+    def _is_api_error(self, error, http_status, reason):
+        """Match a Spotify API error by its HTTP status and reason code rather than its message text"""
+        return (isinstance(error, self._api_error) and error.http_status == http_status
+                and getattr(error, 'reason', None) == reason)
+    
     def play_music(self):
         """Start/resume music playback with enhanced device handling"""
         if not self.is_initialized:
@@ -86,47 +243,43 @@ class SpotifyController:
         
         try:
             logger.info("Attempting to play music...")
-            current = self.get_current_playback()
+            current, devices = self._fetch_state()
             
             if current is None:
                 logger.info("No active playback found. Checking available devices...")
                 # No active device or no music in queue
                 # Try to start playback on available device
-                devices = self.sp.devices()
-                logger.info(f"Available devices: {[d['name'] + ' (' + d['type'] + ')' for d in devices['devices']] if devices and devices['devices'] else 'None'}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Available devices: %s", ", ".join(f"{d['name']} ({d['type']})" for d in (devices or {}).get('devices', [])) or "None")
                 
                 if devices and len(devices['devices']) > 0:
                     # Find an active device or use the first available one
-                    active_device = None
-                    for device in devices['devices']:
-                        if device['is_active']:
-                            active_device = device
-                            break
-                    
-                    if not active_device:
-                        active_device = devices['devices'][0]
+                    devs = devices['devices']
+                    active_device = next((d for d in devs if d['is_active']), devs[0])
                     
                     device_id = active_device['id']
                     device_name = active_device['name']
-                    logger.info(f"Using device: {device_name}")
+                    logger.info("Using device: %s", device_name)
                     
                     # Try to get user's saved tracks or recently played to start something
                     try:
                         # Simplified approach - just try to start playback
                         logger.info("Attempting to start/resume playback...")
                         self.sp.start_playback(device_id=device_id)
+                        self._pb_ts = 0.0
                         logger.info("Started playback successfully")
                     except Exception as e:
-                        if "No active device found" in str(e):
+                        self._devices_cache = None  # The cached device may be gone; look again next time
+                        if self._is_api_error(e, 404, 'NO_ACTIVE_DEVICE'):
                             logger.error("No active Spotify device found")
                             logger.info("Tip: Open Spotify app and start playing any song first")
                             return False
-                        elif "Premium required" in str(e) or "PREMIUM_REQUIRED" in str(e):
+                        elif self._is_api_error(e, 403, 'PREMIUM_REQUIRED'):
                             logger.error("Spotify Premium required for playback control")
                             logger.info("Please ensure your Spotify Premium subscription is active")
                             return False
                         else:
-                            logger.warning(f"Could not start playback: {e}")
+                            logger.warning("Could not start playback: %s", e)
                             logger.info("Tip: Open Spotify app and start playing any song first, then try again")
                             return False
                     
@@ -139,24 +292,25 @@ class SpotifyController:
                 # Resume playback
                 logger.info("Resuming paused music...")
                 self.sp.start_playback()
+                self._pb_ts = 0.0
                 logger.info("Resumed music playback")
             else:
                 logger.info("Music is already playing")
             
             return True
             
-        except spotipy.exceptions.SpotifyException as e:
-            if "Premium required" in str(e) or "PREMIUM_REQUIRED" in str(e):
+        except self._api_error as e:
+            if self._is_api_error(e, 403, 'PREMIUM_REQUIRED'):
                 logger.error("Spotify Premium subscription required for playback control")
                 logger.info("Spotify Free users cannot control playback via API - consider upgrading to Premium")
                 logger.info("Alternative: Music control will be disabled, but posture detection will continue")
                 return False
             else:
-                logger.error(f"Spotify API Error: {e}")
+                logger.error("Spotify API Error: %s", e)
                 logger.info("Tip: Make sure Spotify is open and you have an active internet connection")
                 return False
         except Exception as e:
-            logger.error(f"Failed to play music: {e}")
+            logger.error("Failed to play music: %s", e)
             logger.info("Tip: Make sure Spotify is open and you have an active internet connection")
             return False
     
@@ -171,6 +325,7 @@ class SpotifyController:
             
             if current and current['is_playing']:
                 self.sp.pause_playback()
+                self._pb_ts = 0.0
                 logger.info("Paused music playback")
                 return True
             else:
@@ -178,7 +333,7 @@ class SpotifyController:
                 return False
                 
         except Exception as e:
-            logger.error(f"Failed to pause music: {e}")
+            logger.error("Failed to pause music: %s", e)
             return False
     
     def set_volume(self, volume_percent):
@@ -187,66 +342,86 @@ class SpotifyController:
             return False
         
         try:
-            if volume_percent < 0:
-                volume_percent = 0
-            elif volume_percent > 100:
-                volume_percent = 100
+            volume_percent = max(0, min(100, int(volume_percent)))
+            if volume_percent == self._last_volume:
+                return True  # Already at this level; skip the request
             
             self.sp.volume(volume_percent)
-            logger.info(f"Set Spotify volume to {volume_percent}%")
+            self._pb_ts = 0.0
+            self._last_volume = volume_percent
+            logger.info("Set Spotify volume to %s%%", volume_percent)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to set volume: {e}")
+            logger.error("Failed to set volume: %s", e)
             return False
     
-    def check_premium_status(self):
+    def get_current_user(self):
+        """Return the user profile, re-fetching it once the cached copy is older than USER_CACHE_TTL"""
+        if self._user_cache is None or time.monotonic() - self._user_cache_t > USER_CACHE_TTL:
+            self._user_cache = self.sp.current_user()
+            self._user_cache_t = time.monotonic()
+        return self._user_cache
+    
+    def check_premium_status(self, user=None):
         """Check if user has Spotify Premium with enhanced detection"""
         if not self.is_initialized:
             return None
         
         try:
-            user = self.sp.current_user()
+            # Refresh an expiring token once here, so the parallel calls below don't all refresh it at once
+            self.sp.auth_manager.get_access_token(as_dict=False)
+            
+            # Probe profile, devices and playback at once; the fallbacks are only read if 'product' is missing
+            pool = ThreadPoolExecutor(max_workers=3)
+            user_future = pool.submit(self.get_current_user) if user is None else None
+            devices_future = pool.submit(self._get_devices)
+            playback_future = pool.submit(self.sp.current_playback)
+            # Don't block on the fallbacks when the profile already answers the question
+            pool.shutdown(wait=False)
+            if user_future is not None:
+                user = user_future.result()
+            
             if user:
-                logger.debug(f"User info keys: {list(user.keys())}")  # Debug: show available keys
+                logger.debug("User info keys: %s", list(user.keys()))  # Debug: show available keys
                 
                 if 'product' in user:
                     product = user['product'].lower()
-                    logger.info(f"Spotify account product: '{product}'")
+                    logger.info("Spotify account product: '%s'", product)
                     
                     # Check for various Premium indicators
-                    is_premium = product in ['premium', 'premium_student', 'premium_family', 'premium_duo']
+                    is_premium = product in _PREMIUM_PRODUCTS
                     
                     if is_premium:
-                        logger.info(f"Premium account detected: {product}")
+                        logger.info("Premium account detected: %s", product)
                         return True
                     else:
-                        logger.warning(f"Free account detected: {product}")
+                        logger.warning("Free account detected: %s", product)
                         return False
                 else:
                     logger.info("No 'product' field in user info - checking playback capabilities...")
                     
                     #Try to get available devices (Premium feature for remote control)
                     try:
-                        devices = self.sp.devices()
+                        devices = devices_future.result()
                         if devices and 'devices' in devices:
-                            logger.info(f"Found {len(devices['devices'])} available device(s)")
+                            logger.info("Found %s available device(s)", len(devices['devices']))
                             if len(devices['devices']) > 0:
                                 logger.info("Device control available - likely Premium account")
                                 return True
                     except Exception as device_error:
-                        logger.debug(f"Device check failed: {device_error}")
+                        logger.debug("Device check failed: %s", device_error)
                     
                     # Try to get current playback state
                     try:
-                        current = self.sp.current_playback()
+                        current = playback_future.result()
                         if current:
                             logger.info("Playback state accessible - likely Premium account")
                             return True
                         else:
                             logger.info("No active playback found")
                     except Exception as playback_error:
-                        logger.debug(f"Playback check failed: {playback_error}")
+                        logger.debug("Playback check failed: %s", playback_error)
                     
                     # You need Premium to do this
                     logger.info("Cannot determine status from API - Assuming Premium (music control works)")
@@ -255,5 +430,5 @@ class SpotifyController:
                 logger.warning("Could not retrieve user information")
                 return None
         except Exception as e:
-            logger.error(f"Failed to check Premium status: {e}")
+            logger.error("Failed to check Premium status: %s", e)
             return None
@@ -4,6 +4,7 @@ import logging
 import ctypes
 from ctypes import wintypes
 import platform
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -11,47 +12,97 @@ logger = logging.getLogger(__name__)
 ES_CONTINUOUS = 0x80000000
 ES_SYSTEM_REQUIRED = 0x00000001
 ES_DISPLAY_REQUIRED = 0x00000002
+_PREVENT_FLAGS = ES_CONTINUOUS | ES_SYSTEM_REQUIRED | ES_DISPLAY_REQUIRED
+
+# Operating system, resolved once at import
+_SYSTEM = platform.system()
+IS_WINDOWS = _SYSTEM == "Windows"
+IS_MAC = _SYSTEM == "Darwin"
+IS_LINUX = _SYSTEM == "Linux"
+
+# System DLLs, loaded once and shared by every SystemController; last-error capture gives precise failure logs
+if IS_WINDOWS:
+    _KERNEL32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _USER32 = ctypes.WinDLL('user32', use_last_error=True)
+    _POWRPROF = ctypes.WinDLL('powrprof', use_last_error=True)
+
+    # Explicit prototypes, set once, so 64-bit handles and flags aren't truncated
+    _SetThreadExecutionState = _KERNEL32.SetThreadExecutionState
+    _SetThreadExecutionState.argtypes = [wintypes.DWORD]
+    _SetThreadExecutionState.restype = wintypes.DWORD
+    _SetSuspendState = _POWRPROF.SetSuspendState
+    _SetSuspendState.argtypes = [wintypes.BOOLEAN, wintypes.BOOLEAN, wintypes.BOOLEAN]
+    _SetSuspendState.restype = wintypes.BOOLEAN
+    _LockWorkStation = _USER32.LockWorkStation
+    _LockWorkStation.argtypes = []
+    _LockWorkStation.restype = wintypes.BOOL
+    # Notify variant: a broadcast returns immediately instead of waiting on every (possibly hung) window
+    _SendNotifyMessageW = _USER32.SendNotifyMessageW
+    _SendNotifyMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+    _SendNotifyMessageW.restype = wintypes.BOOL
+else:
+    _KERNEL32 = _USER32 = _POWRPROF = None
+
+def _last_error_text():
+    """Describe the Win32 error recorded by the last DLL call on this thread"""
+    code = ctypes.get_last_error()
+    return f"error {code}: {ctypes.FormatError(code).strip()}"
 
 class SystemController:
     def __init__(self):
         """Initialize Windows-specific system controller"""
-        self.system = "Windows"  # Add system identifier for tests
-        self.kernel32 = ctypes.windll.kernel32
-        self.user32 = ctypes.windll.user32
-        self.powrprof = ctypes.windll.powrprof
+        self.system = _SYSTEM  # Add system identifier for tests
+        self._sleep_prevented = False  # Execution state last set on the execution-state thread
+        
+        # Off Windows every method is a no-op returning False; ctypes.windll isn't touched
+        self._available = IS_WINDOWS
+        if not self._available:
+            logger.info(f"System control is only supported on Windows - disabled on {_SYSTEM}")
+            return
+        
+        self.kernel32 = _KERNEL32
+        self.user32 = _USER32
+        self.powrprof = _POWRPROF
+        
+        # SetThreadExecutionState applies to the calling thread and lapses when it exits, so every
+        # prevent/allow call runs on this one long-lived thread whatever thread asks for it
+        self._exec_state_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="exec-state")
+        
+        # API functions with their prototypes bound at import
+        self._set_exec_state = _SetThreadExecutionState
+        self._set_suspend_state = _SetSuspendState
+        self._lock_workstation = _LockWorkStation
+        self._send_notify_message = _SendNotifyMessageW
         
     def sleep_system(self):
         """Put Windows system to sleep"""
+        if not self._available:
+            return False
         try:
-            # Use Windows API to suspend system
-            result = self.powrprof.SetSuspendState(0, 1, 0)
+            # Use Windows API to suspend system (hibernate=False, force=True, disable wake events=False)
+            result = self._set_suspend_state(False, True, False)
             if result:
                 logger.info("Windows system going to sleep")
                 return True
             else:
-                logger.error("Failed to put Windows system to sleep")
+                logger.error(f"Failed to put Windows system to sleep ({_last_error_text()})")
                 return False
             
         except Exception as e:
             logger.error(f"Error putting Windows system to sleep: {e}")
-            # Fallback to command line method
-            try:
-                subprocess.run(["rundll32.exe", "powrprof.dll,SetSuspendState", "0,1,0"], check=True)
-                logger.info("Windows system going to sleep (fallback method)")
-                return True
-            except subprocess.CalledProcessError as fallback_e:
-                logger.error(f"Fallback sleep method also failed: {fallback_e}")
-                return False
+            return False
     
     def lock_system(self):
         """Lock Windows system"""
+        if not self._available:
+            return False
         try:
-            result = self.user32.LockWorkStation()
+            result = self._lock_workstation()
             if result:
                 logger.info("Windows system locked")
                 return True
             else:
-                logger.error("Failed to lock Windows system")
+                logger.error(f"Failed to lock Windows system ({_last_error_text()})")
                 return False
             
         except Exception as e:
@@ -60,12 +111,19 @@ class SystemController:
     
     def prevent_sleep(self):
         """Prevent Windows system from going to sleep"""
+        if not self._available:
+            return False
+        return self._exec_state_thread.submit(self._prevent_sleep).result()
+    
+    def _prevent_sleep(self):
+        """prevent_sleep body; runs on the execution-state thread"""
+        if self._sleep_prevented:
+            return True
         try:
             # Use SetThreadExecutionState to prevent sleep
-            result = self.kernel32.SetThreadExecutionState(
-                ES_CONTINUOUS | ES_SYSTEM_REQUIRED | ES_DISPLAY_REQUIRED
-            )
+            result = self._set_exec_state(_PREVENT_FLAGS)
             if result:
+                self._sleep_prevented = True
                 logger.info("Windows sleep prevention activated")
                 return True
             else:
@@ -78,9 +136,18 @@ class SystemController:
     
     def allow_sleep(self):
         """Allow Windows system to sleep again"""
+        if not self._available:
+            return False
+        return self._exec_state_thread.submit(self._allow_sleep).result()
+    
+    def _allow_sleep(self):
+        """allow_sleep body; runs on the execution-state thread"""
+        if not self._sleep_prevented:
+            return True
         try:
-            result = self.kernel32.SetThreadExecutionState(ES_CONTINUOUS)
+            result = self._set_exec_state(ES_CONTINUOUS)
             if result:
+                self._sleep_prevented = False
                 logger.info("Windows sleep prevention deactivated")
                 return True
             else:
@@ -93,10 +160,12 @@ class SystemController:
     
     def set_monitor_power(self, power_on=True):
         """Turn monitor on/off"""
+        if not self._available:
+            return False
         try:
             # -1 = turn off, 2 = turn on
             power_state = 2 if power_on else -1
-            result = self.user32.SendMessageW(
+            result = self._send_notify_message(
                 0xFFFF,  # HWND_BROADCAST
                 0x0112,  # WM_SYSCOMMAND
                 0xF170,  # SC_MONITORPOWER
@@ -112,22 +181,25 @@ class SystemController:
 
 def is_windows():
     """Check if the operating system is Windows."""
-    return platform.system() == "Windows"
+    return IS_WINDOWS
 
 def is_mac():
     """Check if the operating system is macOS."""
-    return platform.system() == "Darwin"
+    return IS_MAC
 
 def is_linux():
     """Check if the operating system is Linux."""
-    return platform.system() == "Linux"
+    return IS_LINUX
 
-def run_command(command):
-    """Run a shell command and return the output."""
+def run_command(argv):
+    """Run a command given as an argument list (no shell) and return the output."""
+    if isinstance(argv, str):
+        # Splitting a string would mangle Windows paths; callers pass the argument list themselves
+        raise TypeError("run_command expects an argument list, not a string")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        result = subprocess.run(argv, check=True, capture_output=True, text=True)
         return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        print(f"Error running command: {command}")
-        print(f"Output: {e.stderr.strip()}")
+    except (subprocess.CalledProcessError, OSError) as e:
+        logger.error(f"Error running command: {subprocess.list2cmdline(argv)}")
+        logger.error(f"Output: {e.stderr.strip() if getattr(e, 'stderr', None) else e}")
         return None